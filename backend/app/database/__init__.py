@@ -2,8 +2,8 @@
 Database helpers and SQLAlchemy session management.
 """
 
-from .connection import Base, SessionLocal, engine, get_db
+from .connection import AsyncSessionLocal, Base, SessionLocal, async_engine, engine, get_async_db, get_db
 
-__all__ = ["Base", "SessionLocal", "engine", "get_db"]
+__all__ = ["AsyncSessionLocal", "Base", "SessionLocal", "async_engine", "engine", "get_async_db", "get_db"]
 
 
@@ -1,25 +1,72 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.config import get_settings
+from app.database.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 
 
 settings = get_settings()
 
+# DATABASE_URL may name either a sync or an async driver; the other engine uses its counterpart.
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+}
+_SYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "mysql+aiomysql": "mysql+pymysql",
+    "mysql+asyncmy": "mysql+pymysql",
+}
+
 
 class Base(DeclarativeBase):
     """Base SQLAlchemy declarative class."""
 
 
-def _engine_kwargs():
-    if settings.database_url.startswith("sqlite"):
-        return {"connect_args": {"check_same_thread": False}}
-    return {"pool_pre_ping": True}
+def _with_driver(database_url: str, drivers: dict[str, str]) -> str:
+    url = make_url(database_url)
+    driver = drivers.get(url.drivername)
+    if driver is None:
+        return database_url
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _engine_kwargs(is_async: bool = False):
+    url = make_url(settings.database_url)
+    if url.get_backend_name() == "sqlite":
+        kwargs = {"connect_args": {"check_same_thread": False}}
+        # In-memory databases need SQLAlchemy's single-connection pools.
+        if url.database in (None, "", ":memory:"):
+            return kwargs
+    else:
+        kwargs = {
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            "pool_recycle": settings.db_pool_recycle_seconds,
+        }
+    kwargs.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+    )
+    return kwargs
 
 
-engine = create_engine(settings.database_url, **_engine_kwargs())
+sync_database_url = _with_driver(settings.database_url, _SYNC_DRIVERS)
+async_database_url = settings.async_database_url or _with_driver(settings.database_url, _ASYNC_DRIVERS)
+
+engine = create_engine(sync_database_url, **_engine_kwargs())
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+async_engine = create_async_engine(async_database_url, **_engine_kwargs(is_async=True))
+# Attributes must stay readable after commit: an async session cannot lazily reload them.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     db = SessionLocal()
@@ -29,3 +76,6 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.utils import tracing
+from app.utils.metrics import Histogram, render_histogram
+
+
+class _CheckoutTimingMixin:
+    """Records how long each checkout waited for a pooled (or newly opened) connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = Histogram()
+        self.timeouts = 0
+        self._timeouts_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        with tracing.span("db.pool.checkout", pool_class=type(self).__name__):
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                # Checkouts time out on many threads at once; += on an attribute is not atomic.
+                with self._timeouts_lock:
+                    self.timeouts += 1
+                raise
+            finally:
+                self.wait_histogram.observe(time.perf_counter() - started)
+
+    def recreate(self):
+        # Pool.recreate() builds a fresh instance; keep the history across it.
+        pool = super().recreate()
+        pool.wait_histogram = self.wait_histogram
+        pool.timeouts = self.timeouts
+        return pool
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool: Pool) -> dict:
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            # QueuePool counts overflow from -pool_size; only connections beyond pool_size matter here.
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout_seconds=pool.timeout(),
+        )
+    if isinstance(pool, _CheckoutTimingMixin):
+        status["checkout_timeouts"] = pool.timeouts
+        status["checkout_wait_seconds"] = pool.wait_histogram.snapshot()
+    return status
+
+
+def pool_metrics(pools: dict[str, Pool]) -> list[str]:
+    """Prometheus exposition lines for the named pools, read at scrape time."""
+    gauges = ("size", "checked_in", "checked_out", "overflow")
+    lines = []
+    statuses = {name: pool_status(pool) for name, pool in pools.items()}
+    for gauge in gauges:
+        lines.append(f"# TYPE db_pool_{gauge} gauge")
+        lines.extend(
+            f'db_pool_{gauge}{{engine="{name}"}} {status[gauge]}'
+            for name, status in statuses.items()
+            if gauge in status
+        )
+    lines.append("# TYPE db_pool_checkout_timeouts_total counter")
+    lines.extend(
+        f'db_pool_checkout_timeouts_total{{engine="{name}"}} {status["checkout_timeouts"]}'
+        for name, status in statuses.items()
+        if "checkout_timeouts" in status
+    )
+    lines.append("# TYPE db_pool_checkout_wait_seconds histogram")
+    for name, status in statuses.items():
+        if "checkout_wait_seconds" in status:
+            lines.extend(render_histogram("db_pool_checkout_wait_seconds", status["checkout_wait_seconds"], {"engine": name}))
+    return lines
@@ -1,20 +1,69 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 from app.config import get_settings
-from app.database.connection import Base, engine
+from app.database.connection import async_engine, engine
+from app.database.migrations import run_migrations
+from app.database.pool import pool_metrics, pool_status
 from app.middleware.auth_middleware import AuthMiddleware
-from app.models import User, Project, DocumentStructure, Content, RefinementHistory
+from app.middleware.metrics_middleware import MetricsMiddleware, instrument_engine
+from app.middleware.tracing_middleware import REQUEST_ID_HEADER, TracingMiddleware, trace_engine
 from app.routes import auth, export, generate, projects, outline
-
-Base.metadata.create_all(bind=engine)
+from app.services import document_service
+from app.services.cache_service import prompt_cache
+from app.services.export_jobs import export_jobs
+from app.services.feedback_service import feedback_buffer
+from app.services.llm_provider import get_provider
+from app.utils.metrics import REGISTRY
+from app.utils.security import shutdown_hash_pool
+from app.utils.tracing import shutdown_tracing
 
 settings = get_settings()
 
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+trace_engine(engine)
+trace_engine(async_engine.sync_engine)
+REGISTRY.add_collector(lambda: pool_metrics({"sync": engine.pool, "async": async_engine.pool}))
+
+
+def _warm_up() -> None:
+    # Pays the SDK import and export template parsing before the first request instead of during it.
+    get_provider()
+    document_service.warm_up()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Schema changes are an explicit step (init_db.py / alembic), not something every worker does.
+    if settings.db_migrate_on_startup:
+        await run_in_threadpool(run_migrations)
+    if settings.warm_up_on_startup:
+        await run_in_threadpool(_warm_up)
+    elif settings.export_docx_template or settings.export_pptx_template:
+        # A bad template path should stop the worker now, not fail its first export.
+        await run_in_threadpool(document_service.load_templates)
+    yield
+    if feedback_buffer is not None:
+        feedback_buffer.shutdown()
+    shutdown_hash_pool()
+    prompt_cache.flush_hits()
+    export_jobs.shutdown()
+    shutdown_tracing()
+    # Closes pooled connections; aiosqlite keeps a worker thread per open connection.
+    await async_engine.dispose()
+    engine.dispose()
+
+
 app = FastAPI(
     title="AI-Assisted Document Authoring API",
     version="0.2.0",
     description="Backend service for generating and refining business documents with Gemini.",
+    lifespan=lifespan,
 )
 
 cors_origins = [origin.strip() for origin in settings.cors_origins.split(",")]
@@ -25,8 +74,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_credentials=True,
+    expose_headers=[REQUEST_ID_HEADER],
 )
 app.add_middleware(AuthMiddleware)
+# Middleware added later wraps earlier ones: metrics time the full request inside its trace.
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 app.include_router(auth.router)
 app.include_router(projects.router)
@@ -39,3 +92,22 @@ app.include_router(outline.router)
 def health_check():
     return {"status": "ok"}
 
+
+@app.get("/health/cache")
+def cache_stats():
+    return prompt_cache.stats()
+
+
+@app.get("/health/llm")
+def llm_state():
+    return get_provider().state()
+
+
+@app.get("/health/db")
+def database_pool_state():
+    return {"sync": pool_status(engine.pool), "async": pool_status(async_engine.pool)}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -1,26 +1,32 @@
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 
 from jose import JWTError
 
-from app.database.connection import SessionLocal
-from app.services.auth_service import decode_access_token, get_user_by_email
+from app.services.auth_service import resolve_user_from_token
+from app.utils import tracing
 
 
 class AuthMiddleware(BaseHTTPMiddleware):
-    """Best-effort middleware to attach authenticated user to request.state."""
+    """Best-effort middleware to attach authenticated user to request.state.
+
+    ``get_current_user`` reuses the result, so each request resolves its token once.
+    """
 
     async def dispatch(self, request: Request, call_next):
         token = _extract_token(request)
+        request.state.user = None
         if token:
-            try:
-                email = decode_access_token(token)
-                with SessionLocal() as db:
-                    user = get_user_by_email(db, email)
-                    if user:
-                        request.state.user = user
-            except JWTError:
-                request.state.user = None
+            with tracing.span("auth.resolve_user") as span:
+                try:
+                    # The lookup may hit the database, so keep it off the event loop.
+                    request.state.user = await run_in_threadpool(resolve_user_from_token, token)
+                except JWTError:
+                    pass
+                if span is not None:
+                    span.set(authenticated=request.state.user is not None)
+            request.state.auth_token = token
         response = await call_next(request)
         return response
 
@@ -0,0 +1,97 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.utils.metrics import COUNT_BUCKETS, REGISTRY
+
+http_requests_total = REGISTRY.counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status"),
+)
+db_queries_per_request = REGISTRY.histogram(
+    "db_queries_per_request",
+    "SQL statements executed while serving one request.",
+    ("route",),
+    buckets=COUNT_BUCKETS,
+)
+db_time_per_request = REGISTRY.histogram(
+    "db_time_per_request_seconds",
+    "Total SQL execution time while serving one request.",
+    ("route",),
+)
+db_query_duration = REGISTRY.histogram(
+    "db_query_duration_seconds",
+    "Latency of individual SQL statements by statement type.",
+    ("statement",),
+)
+
+# Per-request accumulator. A mutable dict is set before the app runs, so the copies of the
+# context taken by call_next's task and by threadpool hops all update the same object.
+_request_db_stats: ContextVar[Optional[dict]] = ContextVar("request_db_stats", default=None)
+
+
+def _route_template(request: Request) -> str:
+    route = request.scope.get("route")
+    # Unmatched paths share one label so scanners cannot blow up the series count.
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Records request count/latency and per-request SQL statement count/time."""
+
+    async def dispatch(self, request: Request, call_next):
+        stats = {"queries": 0, "seconds": 0.0}
+        token = _request_db_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db_stats.reset(token)
+            route = _route_template(request)
+            labels = {"method": request.method, "route": route, "status": status_code}
+            http_requests_total.inc(**labels)
+            http_request_duration.observe(elapsed, **labels)
+            db_queries_per_request.observe(stats["queries"], route=route)
+            db_time_per_request.observe(stats["seconds"], route=route)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach statement timers to a (sync) engine; pass ``async_engine.sync_engine`` for async ones."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_query_duration.observe(elapsed, statement=verb)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats["queries"] += 1
+            stats["seconds"] += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # after_cursor_execute does not run for a failed statement; drop its start time here
+        # so it does not stay on the pooled connection.
+        conn = exception_context.connection
+        started = conn.info.get("query_started") if conn is not None else None
+        if started:
+            started.pop()
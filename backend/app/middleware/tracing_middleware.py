@@ -0,0 +1,63 @@
+import re
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.utils import tracing
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_TRACE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    """Opens a trace per request, keyed by ``X-Request-ID`` and echoed back on the response.
+
+    A caller-supplied 32-hex-digit id becomes the trace id so spans can be joined with
+    upstream logs; any other value is kept as the ``request.id`` attribute instead.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        incoming = request.headers.get(REQUEST_ID_HEADER, "")
+        trace_id = incoming.lower() if _TRACE_ID.match(incoming.lower()) else None
+        with tracing.trace(trace_id) as trace_id:
+            request_id = incoming or trace_id
+            with tracing.span("http.request", method=request.method, path=request.url.path) as span:
+                response = await call_next(request)
+                if span is not None:
+                    route = request.scope.get("route")
+                    span.set(
+                        route=getattr(route, "path", "unmatched"),
+                        status_code=response.status_code,
+                        **({"request.id": request_id} if request_id != trace_id else {}),
+                    )
+        response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+
+def trace_engine(engine: Engine) -> None:
+    """Emit a span per SQL statement; pass ``async_engine.sync_engine`` for async engines."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("trace_spans", []).append(
+            tracing.start_span("db.query", statement=statement[:500], executemany=executemany)
+        )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        span = conn.info["trace_spans"].pop()
+        if span is not None:
+            span.set(rowcount=cursor.rowcount)
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("trace_spans") if conn is not None else None
+        if spans:
+            span = spans.pop()
+            if span is not None:
+                span.record_error(exception_context.original_exception)
+                span.end()
@@ -5,7 +5,8 @@ SQLAlchemy models for AI Document Authoring platform.
 from .user import User
 from .project import Project, DocumentStructure
 from .content import Content, RefinementHistory
+from .cache import PromptCacheEntry
 
-__all__ = ["User", "Project", "DocumentStructure", "Content", "RefinementHistory"]
+__all__ = ["User", "Project", "DocumentStructure", "Content", "RefinementHistory", "PromptCacheEntry"]
 
 
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String, Text
+
+from app.database.connection import Base
+
+
+class PromptCacheEntry(Base):
+    __tablename__ = "prompt_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, nullable=False, index=True)
+    model_name = Column(String(100), nullable=False)
+    response_text = Column(Text, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False)
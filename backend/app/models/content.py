@@ -1,13 +1,19 @@
 from datetime import datetime
+from typing import Iterable, Optional, Sequence
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Text
+from sqlalchemy.orm import object_session, relationship
 
+from app.config import get_settings
 from app.database.connection import Base
+from app.utils.delta import apply_delta, encode_revision
+
+settings = get_settings()
 
 
 class Content(Base):
     __tablename__ = "content_blocks"
+    __table_args__ = (Index("uq_content_blocks_structure_id", "structure_id", unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
     structure_id = Column(Integer, ForeignKey("document_structure.id", ondelete="CASCADE"), nullable=False)
@@ -24,21 +30,92 @@ class Content(Base):
         "RefinementHistory",
         back_populates="content",
         cascade="all, delete-orphan",
-        order_by="RefinementHistory.created_at",
+        order_by="[RefinementHistory.created_at, RefinementHistory.id]",
     )
 
+    def record_refinement(
+        self,
+        original: str,
+        revised: str,
+        prompt: str,
+        chain: Optional[Sequence["RefinementHistory"]] = None,
+    ) -> "RefinementHistory":
+        """Append the revision that turned ``original`` into ``revised``.
+
+        ``chain`` is the history from its latest snapshot onward (see
+        ``database_service.get_history_tail``), so appending costs one snapshot interval
+        rather than the whole history. Without it ``history`` is used, which suits new objects.
+        """
+        if chain is None:
+            chain = from_latest_snapshot(self.history)
+        decode_history(chain)
+        previous = chain[-1].new_content if chain else None
+        base_content, delta = encode_revision(
+            previous, original, revised, max(len(chain) - 1, 0), settings.history_snapshot_interval
+        )
+        entry = RefinementHistory(base_content=base_content, delta=delta, refinement_prompt=prompt)
+        entry.__dict__["_versions"] = (original or "", revised)
+        # Setting the parent side queues the row on an unloaded ``history`` without loading it.
+        entry.content = self
+        session = object_session(self)
+        if session is not None:
+            session.add(entry)
+        return entry
+
 
 class RefinementHistory(Base):
+    """One refinement, stored as a delta against the previous revision.
+
+    ``base_content`` holds a full snapshot of the pre-refinement text on the first row of a
+    chain (and every ``HISTORY_SNAPSHOT_INTERVAL`` rows); other rows only carry ``delta``.
+    ``old_content``/``new_content`` are reconstructed from the loaded chain on first access.
+    """
+
     __tablename__ = "refinement_history"
+    __table_args__ = (Index("ix_refinement_history_content_id_created_at", "content_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     content_id = Column(Integer, ForeignKey("content_blocks.id", ondelete="CASCADE"), nullable=False)
-    old_content = Column(Text, nullable=True)
-    new_content = Column(Text, nullable=False)
+    base_content = Column(Text, nullable=True)
+    delta = Column(Text, nullable=False)
     refinement_prompt = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     content = relationship("Content", back_populates="history")
 
+    @property
+    def old_content(self) -> str:
+        return self._decoded()[0]
+
+    @property
+    def new_content(self) -> str:
+        return self._decoded()[1]
+
+    def _decoded(self) -> tuple[str, str]:
+        if "_versions" not in self.__dict__:
+            history = self.content.history
+            decode_history(from_latest_snapshot(history[: history.index(self) + 1]))
+        return self.__dict__["_versions"]
+
+
+def from_latest_snapshot(entries: Sequence[RefinementHistory]) -> Sequence[RefinementHistory]:
+    """The tail of ``entries`` (in order) starting at its last snapshot row."""
+    for index in range(len(entries) - 1, -1, -1):
+        if entries[index].base_content is not None:
+            return entries[index:]
+    return entries
+
 
+def decode_history(entries: Iterable[RefinementHistory]) -> None:
+    """Reconstruct full texts for ``entries`` (in order, starting at a snapshot row)."""
+    previous = None
+    for entry in entries:
+        versions = entry.__dict__.get("_versions")
+        if versions is None:
+            old = entry.base_content if entry.base_content is not None else previous
+            if old is None:
+                raise ValueError(f"refinement history {entry.id} has no snapshot to apply its delta to")
+            versions = (old, apply_delta(old, entry.delta))
+            entry.__dict__["_versions"] = versions
+        previous = versions[1]
@@ -1,19 +1,24 @@
 from datetime import datetime
+from itertools import chain
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String, event, inspect, or_, select, update
+from sqlalchemy.orm import Session, relationship
 
 from app.database.connection import Base
+from app.models.content import Content
 
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (Index("ix_projects_user_id_updated_at", "user_id", "updated_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     project_name = Column(String(255), nullable=False)
     document_type = Column(Enum("docx", "pptx", name="document_type_enum"), nullable=False)
     main_topic = Column(String(500), nullable=False)
+    # Bumped whenever anything an export renders changes; part of the export ETag.
+    content_version = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -28,6 +33,7 @@ class Project(Base):
 
 class DocumentStructure(Base):
     __tablename__ = "document_structure"
+    __table_args__ = (Index("ix_document_structure_project_id_order_index", "project_id", "order_index"),)
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
@@ -45,3 +51,43 @@ class DocumentStructure(Base):
     )
 
 
+def _changed(session: Session, obj, attributes: tuple[str, ...]) -> bool:
+    if obj in session.new or obj in session.deleted:
+        return True
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_content_versions(session: Session, _flush_context, _instances) -> None:
+    """Bump ``Project.content_version`` for projects whose rendered content is changing.
+
+    Feedback counters and comments are not rendered, so they leave cached exports valid.
+    Bulk statements bypass this hook; ``sync_project_structures`` touches ``updated_at``,
+    which counts as a project change.
+    """
+    project_ids, structure_ids = set(), set()
+    for obj in chain(session.dirty, session.deleted, session.new):
+        if isinstance(obj, Project):
+            if obj not in session.new and session.is_modified(obj):
+                project_ids.add(obj.id)
+        elif isinstance(obj, DocumentStructure):
+            if _changed(session, obj, ("title", "order_index", "element_type")):
+                project_ids.add(obj.project_id if obj.project_id is not None else getattr(obj.project, "id", None))
+        elif isinstance(obj, Content):
+            if _changed(session, obj, ("generated_content",)):
+                structure_ids.add(obj.structure_id if obj.structure_id is not None else getattr(obj.structure, "id", None))
+    project_ids.discard(None)
+    structure_ids.discard(None)
+    if not project_ids and not structure_ids:
+        return
+    # Core statement on the flush's connection: a relative increment, and no recursive autoflush.
+    projects = Project.__table__
+    owning_projects = select(DocumentStructure.__table__.c.project_id).where(
+        DocumentStructure.__table__.c.id.in_(structure_ids)
+    )
+    session.connection().execute(
+        update(projects)
+        .where(or_(projects.c.id.in_(project_ids), projects.c.id.in_(owning_projects)))
+        .values(content_version=projects.c.content_version + 1)
+    )
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import schemas
 from app.database.connection import get_db
@@ -9,17 +10,17 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED)
-def register_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing = auth_service.get_user_by_email(db, user_in.email)
+async def register_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(auth_service.get_user_by_email, db, user_in.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = auth_service.register_user(db, user_in)
+    user = await auth_service.register_user(db, user_in)
     return user
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
-    user = auth_service.authenticate_user(db, user_in.email, user_in.password)
+async def login(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
+    user = await auth_service.authenticate_user(db, user_in.email, user_in.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
     token, expires_at = auth_service.create_access_token(user.email)
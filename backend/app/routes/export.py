@@ -1,31 +1,141 @@
-from fastapi import APIRouter, Depends, Response
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app import models
-from app.database.connection import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app import models, schemas
+from app.config import get_settings
+from app.database.connection import get_async_db
 from app.services import auth_service, database_service, document_service
+from app.services.cache_service import export_cache
+from app.services.export_jobs import export_jobs
 
+settings = get_settings()
 router = APIRouter(prefix="/export", tags=["export"])
 
+MEDIA_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
 
-@router.get("/{project_id}")
-def export_project(
+
+def _etag(key: str) -> str:
+    # Weak: a re-render of the same version is equivalent, not necessarily byte-identical.
+    return f'W/"{key}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _job_out(job: dict) -> schemas.ExportJobOut:
+    status_url = f"/export/jobs/{job['id']}"
+    return schemas.ExportJobOut(
+        id=job["id"],
+        project_id=job["project_id"],
+        status=job["status"],
+        error=job["error"],
+        status_url=status_url,
+        download_url=f"{status_url}/download" if job["status"] == "done" else None,
+    )
+
+
+def _accepted(job: dict) -> JSONResponse:
+    body = _job_out(job)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED, content=body.model_dump(), headers={"Location": body.status_url}
+    )
+
+
+async def _fingerprint(db: AsyncSession, project_id: int, user_id: int):
+    """``(cache key, project name, document type, section count)`` from one narrow query."""
+    name, document_type, version, section_count = await db.run_sync(
+        database_service.get_export_version, project_id, user_id
+    )
+    key = export_cache.make_key(project_id, version, document_type, document_service.template_signature(document_type))
+    return key, name, document_type, section_count
+
+
+async def _submit_job(db: AsyncSession, project_id: int, user_id: int, key: str, payload: Optional[bytes]) -> dict:
+    """Start a job for ``key``, the cache lookup for which returned ``payload``."""
+    if payload is None:
+        # A retry or double click joins the render already under way instead of loading the tree again.
+        existing = await run_in_threadpool(export_jobs.find, key, user_id)
+        if existing is not None:
+            return existing
+    project = await db.run_sync(database_service.get_project_for_user, project_id, user_id)
+    rendered_key = export_cache.make_key(
+        project_id,
+        project.content_version,
+        project.document_type,
+        document_service.template_signature(project.document_type),
+    )
+    if rendered_key != key:
+        # Edited since the lookup; the payload, if any, is of the older version.
+        payload = None
+    # Collecting sections touches the ORM objects, so it stays on this side of the pool.
+    return await run_in_threadpool(export_jobs.submit, project, user_id, rendered_key, payload)
+
+
+@router.post("/{project_id}/jobs", response_model=schemas.ExportJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def create_export_job(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth_service.get_current_user),
 ):
-    project = database_service.get_project_for_user(db, project_id, current_user.id)
-    structures = project.structures
-    if project.document_type == "docx":
-        payload = document_service.export_docx(project, structures)
-        filename = f"{project.project_name}.docx"
-        media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    else:
-        payload = document_service.export_pptx(project, structures)
-        filename = f"{project.project_name}.pptx"
-        media_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+    key, *_ = await _fingerprint(db, project_id, current_user.id)
+    return _accepted(await _submit_job(db, project_id, current_user.id, key, export_cache.get(key)))
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.ExportJobOut)
+async def get_export_job(job_id: str, current_user: models.User = Depends(auth_service.get_current_user)):
+    return _job_out(await run_in_threadpool(export_jobs.get, job_id, current_user.id))
+
 
-    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
-    return Response(content=payload, media_type=media_type, headers=headers)
+@router.get("/jobs/{job_id}/download")
+async def download_export_job(job_id: str, current_user: models.User = Depends(auth_service.get_current_user)):
+    job = await run_in_threadpool(export_jobs.get, job_id, current_user.id)
+    if job["status"] != "done":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Export job is {job['status']}")
+    return FileResponse(job["path"], media_type=MEDIA_TYPES[job["document_type"]], filename=job["filename"])
+
+
+@router.get("/{project_id}")
+async def export_project(
+    project_id: int,
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth_service.get_current_user),
+):
+    # One narrow query decides between 304, a cached render and rendering.
+    key, name, document_type, section_count = await _fingerprint(db, project_id, current_user.id)
+    # no-cache: clients may keep the file but must revalidate, which costs them a 304.
+    headers = {"ETag": _etag(key), "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, headers["ETag"]):
+        export_cache.record_not_modified()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
+    payload = export_cache.get(key)
+    if payload is None and section_count > settings.export_sync_max_sections:
+        # Too large to render inside a request; hand back a job to poll instead.
+        return _accepted(await _submit_job(db, project_id, current_user.id, key, None))
+    if payload is None:
+        project = await db.run_sync(database_service.get_project_for_user, project_id, current_user.id)
+        # Key the render by the version it was actually rendered from, in case of a concurrent edit.
+        name, document_type = project.project_name, project.document_type
+        key = export_cache.make_key(
+            project_id, project.content_version, document_type, document_service.template_signature(document_type)
+        )
+        headers["ETag"] = _etag(key)
+        # Rendering is CPU-bound python-docx/python-pptx work; keep it off the event loop.
+        render = document_service.export_docx if document_type == "docx" else document_service.export_pptx
+        payload = await run_in_threadpool(render, project, project.structures)
+        export_cache.put(key, payload)
 
+    headers["Content-Disposition"] = f'attachment; filename="{name}.{document_type}"'
+    return Response(content=payload, media_type=MEDIA_TYPES[document_type], headers=headers)
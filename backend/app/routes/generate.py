@@ -1,107 +1,288 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import models, schemas
-from app.database.connection import get_db
-from app.services import auth_service, database_service, gemini_service
+from app.database.connection import SessionLocal, get_async_db
+from app.services import auth_service, database_service, feedback_service, gemini_service
 
 router = APIRouter(prefix="/generate", tags=["generation"])
 
 
+def _apply_generated(structure: models.DocumentStructure, generated: str, prompt: str) -> None:
+    if structure.content:
+        structure.content.generated_content = generated
+        structure.content.refinement_prompt = prompt
+    else:
+        structure.content = models.Content(
+            generated_content=generated,
+            refinement_prompt=prompt,
+        )
+
+
+def _apply_refinement(
+    structure: models.DocumentStructure,
+    original: str,
+    revised: str,
+    prompt: str,
+    chain: list[models.RefinementHistory],
+) -> None:
+    structure.content.record_refinement(original, revised, prompt, chain)
+    structure.content.generated_content = revised
+    structure.content.refinement_prompt = prompt
+
+
+async def _structure_out(
+    db: AsyncSession,
+    structure_id: int,
+    user_id: int,
+    include_history: bool,
+) -> schemas.DocumentStructureOut:
+    structure = await db.run_sync(
+        database_service.get_structure_for_user, structure_id, user_id, include_history=include_history
+    )
+    return schemas.DocumentStructureOut.model_validate(structure, context={"include_history": include_history})
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_and_persist(structure_id: int, chunks: Iterator[str], persist) -> Iterator[str]:
+    """Forward model chunks as SSE, then store the full text with ``persist(db, structure, text)``.
+
+    The request-scoped session is closed before a streaming body runs, so persistence
+    uses its own session.
+    """
+    parts = []
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            yield _sse("chunk", {"text": chunk})
+        with SessionLocal() as db:
+            structure = db.get(models.DocumentStructure, structure_id)
+            persist(db, structure, "".join(parts))
+            db.commit()
+            db.refresh(structure)
+            result = schemas.DocumentStructureOut.model_validate(structure)
+        yield _sse("done", json.loads(result.model_dump_json()))
+    except Exception as exc:
+        yield _sse("error", {"detail": str(exc)})
+
+
 @router.post("/{structure_id}", response_model=schemas.DocumentStructureOut)
-def generate_section(
+async def generate_section(
     structure_id: int,
     payload: schemas.GenerateRequest,
-    db: Session = Depends(get_db),
+    include_history: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth_service.get_current_user),
 ):
-    structure = database_service.get_structure_for_user(db, structure_id, current_user.id)
-    project = structure.project
+    structure = await db.run_sync(database_service.get_structure_for_user, structure_id, current_user.id)
     heading = structure.title
+    document_type = structure.project.document_type
+    # Hand the connection back to the pool for the model call; a slow upstream must not hold it.
+    await db.close()
     # Use heading as prompt for generation
-    generated = gemini_service.generate_content(
+    generated = await run_in_threadpool(
+        gemini_service.generate_content,
         heading,
-        document_type=project.document_type,
+        document_type=document_type,
         side_heading=payload.side_heading,
         lines_count=payload.lines_count,
+        use_cache=payload.use_cache,
     )
-    if structure.content:
-        structure.content.generated_content = generated
-        structure.content.refinement_prompt = payload.prompt
-    else:
-        structure.content = models.Content(
-            generated_content=generated,
-            refinement_prompt=payload.prompt,
-        )
-    db.commit()
-    db.refresh(structure)
-    return structure
+    structure = await db.run_sync(database_service.get_structure_for_user, structure_id, current_user.id)
+    _apply_generated(structure, generated, payload.prompt)
+    await db.commit()
+    return await _structure_out(db, structure_id, current_user.id, include_history)
+
+
+@router.post("/{structure_id}/stream")
+async def generate_section_stream(
+    structure_id: int,
+    payload: schemas.GenerateRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth_service.get_current_user),
+):
+    structure = await db.run_sync(database_service.get_structure_for_user, structure_id, current_user.id)
+    chunks = gemini_service.stream_content(
+        structure.title,
+        document_type=structure.project.document_type,
+        side_heading=payload.side_heading,
+        lines_count=payload.lines_count,
+        use_cache=payload.use_cache,
+    )
+
+    def persist(_db: Session, target: models.DocumentStructure, text: str) -> None:
+        _apply_generated(target, text, payload.prompt)
+
+    return StreamingResponse(
+        _stream_and_persist(structure.id, chunks, persist),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/project/{project_id}", response_model=schemas.ProjectGenerateOut)
+async def generate_project(
+    project_id: int,
+    payload: schemas.ProjectGenerateRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth_service.get_current_user),
+):
+    project = await db.run_sync(database_service.get_project_for_user, project_id, current_user.id)
+    structures = project.structures
+    if payload.structure_ids is not None:
+        wanted = set(payload.structure_ids)
+        structures = [structure for structure in structures if structure.id in wanted]
+        missing = wanted - {structure.id for structure in structures}
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Structures not found: {sorted(missing)}")
+
+    # The session is not thread-safe, so only plain arguments cross into the worker threads.
+    structure_ids = [structure.id for structure in structures]
+    jobs = [
+        {
+            "prompt": structure.title,
+            "document_type": project.document_type,
+            "side_heading": payload.side_heading,
+            "lines_count": payload.lines_count,
+            "use_cache": payload.use_cache,
+        }
+        for structure in structures
+    ]
+    # Hand the connection back to the pool for the whole batch; results are applied afterwards.
+    await db.close()
+    outcomes = await run_in_threadpool(
+        gemini_service.generate_content_batch,
+        jobs,
+        max_concurrency=payload.max_concurrency,
+    )
+
+    project = await db.run_sync(database_service.get_project_for_user, project_id, current_user.id)
+    current = {structure.id: structure for structure in project.structures}
+    results = []
+    for structure_id, outcome in zip(structure_ids, outcomes):
+        if structure_id not in current:
+            outcome = LookupError("Structure was deleted during generation")
+        if isinstance(outcome, Exception):
+            results.append(schemas.SectionGenerateResult(structure_id=structure_id, success=False, error=str(outcome)))
+            continue
+        _apply_generated(current[structure_id], outcome, payload.prompt)
+        results.append(schemas.SectionGenerateResult(structure_id=structure_id, success=True))
+    await db.commit()
+    project = await db.run_sync(database_service.get_project_for_user, project_id, current_user.id)
+    return schemas.ProjectGenerateOut(project=project, results=results)
 
 
 @router.post("/{structure_id}/refine", response_model=schemas.DocumentStructureOut)
-def refine_content(
+async def refine_content(
     structure_id: int,
     payload: schemas.RefineRequest,
-    db: Session = Depends(get_db),
+    include_history: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth_service.get_current_user),
 ):
-    structure = database_service.get_structure_for_user(db, structure_id, current_user.id)
+    structure = await db.run_sync(database_service.get_structure_for_user, structure_id, current_user.id)
     if not structure.content:
         raise HTTPException(status_code=400, detail="Content not generated yet")
     original = structure.content.generated_content
-    revised = gemini_service.generate_content(
+    document_type = structure.project.document_type
+    # Hand the connection back to the pool for the model call; a slow upstream must not hold it.
+    await db.close()
+    revised = await run_in_threadpool(
+        gemini_service.generate_content,
+        payload.prompt,
+        context=original,
+        document_type=document_type,
+        side_heading=payload.side_heading,
+        lines_count=payload.lines_count,
+        use_cache=payload.use_cache,
+    )
+    structure = await db.run_sync(database_service.get_structure_for_user, structure_id, current_user.id)
+    # The new revision is stored as a delta against the chain since the latest snapshot.
+    chain = await db.run_sync(database_service.get_history_tail, structure.content.id)
+    _apply_refinement(structure, original, revised, payload.prompt, chain)
+    await db.commit()
+    return await _structure_out(db, structure_id, current_user.id, include_history)
+
+
+@router.post("/{structure_id}/refine/stream")
+async def refine_content_stream(
+    structure_id: int,
+    payload: schemas.RefineRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth_service.get_current_user),
+):
+    structure = await db.run_sync(database_service.get_structure_for_user, structure_id, current_user.id)
+    if not structure.content:
+        raise HTTPException(status_code=400, detail="Content not generated yet")
+    original = structure.content.generated_content
+    chunks = gemini_service.stream_content(
         payload.prompt,
         context=original,
         document_type=structure.project.document_type,
         side_heading=payload.side_heading,
         lines_count=payload.lines_count,
+        use_cache=payload.use_cache,
     )
-    history_entry = models.RefinementHistory(
-        content_id=structure.content.id,
-        old_content=original,
-        new_content=revised,
-        refinement_prompt=payload.prompt,
+
+    def persist(sync_db: Session, target: models.DocumentStructure, text: str) -> None:
+        chain = database_service.get_history_tail(sync_db, target.content.id)
+        _apply_refinement(target, original, text, payload.prompt, chain)
+
+    return StreamingResponse(
+        _stream_and_persist(structure.id, chunks, persist),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    structure.content.generated_content = revised
-    structure.content.refinement_prompt = payload.prompt
-    db.add(history_entry)
-    db.commit()
-    db.refresh(structure)
-    return structure
 
 
-@router.post("/{structure_id}/feedback", response_model=schemas.DocumentStructureOut)
-def submit_feedback(
+@router.post("/{structure_id}/feedback", response_model=schemas.FeedbackOut)
+async def submit_feedback(
     structure_id: int,
     payload: schemas.FeedbackRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth_service.get_current_user),
 ):
-    structure = database_service.get_structure_for_user(db, structure_id, current_user.id)
-    if not structure.content:
-        raise HTTPException(status_code=400, detail="Content not generated yet")
-    if payload.positive:
-        structure.content.likes_count += 1
-    else:
-        structure.content.dislikes_count += 1
-    db.commit()
-    db.refresh(structure)
-    return structure
+    return await db.run_sync(feedback_service.record_feedback, structure_id, current_user.id, payload.positive)
 
 
 @router.post("/{structure_id}/comment", response_model=schemas.DocumentStructureOut)
-def add_comment(
+async def add_comment(
     structure_id: int,
     payload: schemas.CommentRequest,
-    db: Session = Depends(get_db),
+    include_history: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth_service.get_current_user),
 ):
-    structure = database_service.get_structure_for_user(db, structure_id, current_user.id)
+    structure = await db.run_sync(database_service.get_structure_for_user, structure_id, current_user.id)
     if not structure.content:
         raise HTTPException(status_code=400, detail="Content not generated yet")
     structure.content.comments = payload.comment
-    db.commit()
-    db.refresh(structure)
-    return structure
+    await db.commit()
+    return await _structure_out(db, structure_id, current_user.id, include_history)
 
 
+@router.get("/{structure_id}/history", response_model=schemas.RefinementHistoryPage)
+async def list_history(
+    structure_id: int,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth_service.get_current_user),
+):
+    rows, next_cursor = await db.run_sync(
+        database_service.list_history_for_user,
+        structure_id,
+        current_user.id,
+        limit=limit,
+        cursor=cursor,
+    )
+    return schemas.RefinementHistoryPage(items=rows, next_cursor=next_cursor)
@@ -15,5 +15,6 @@ def suggest_outline(
         payload.document_type,
         payload.main_topic,
         payload.desired_sections,
+        use_cache=payload.use_cache,
     )
     return {"suggestions": suggestions}
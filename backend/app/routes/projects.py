@@ -1,105 +1,82 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
-from app.database.connection import get_db
+from app.database.connection import get_async_db
 from app.services import auth_service, database_service
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
 @router.get("/", response_model=list[schemas.ProjectOut])
-def list_projects(
-    db: Session = Depends(get_db),
+async def list_projects(
+    include_history: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth_service.get_current_user),
 ):
-    return (
-        db.query(models.Project)
-        .filter(models.Project.user_id == current_user.id)
-        .order_by(models.Project.updated_at.desc())
-        .all()
+    projects = await db.run_sync(
+        database_service.list_projects_for_user, current_user.id, include_history=include_history
     )
+    context = {"include_history": include_history}
+    return [schemas.ProjectOut.model_validate(project, context=context) for project in projects]
 
 
-@router.post("/", response_model=schemas.ProjectOut, status_code=status.HTTP_201_CREATED)
-def create_project(
-    payload: schemas.ProjectCreate,
-    db: Session = Depends(get_db),
+@router.get("/summary", response_model=schemas.ProjectSummaryPage)
+async def list_project_summaries(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    document_type: Optional[Literal["docx", "pptx"]] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth_service.get_current_user),
 ):
-    project = models.Project(
-        user_id=current_user.id,
-        project_name=payload.project_name,
-        document_type=payload.document_type,
-        main_topic=payload.main_topic,
+    rows, next_cursor = await db.run_sync(
+        database_service.list_project_summaries,
+        current_user.id,
+        limit=limit,
+        cursor=cursor,
+        document_type=document_type,
     )
-    db.add(project)
-    db.flush()
+    return schemas.ProjectSummaryPage(items=rows, next_cursor=next_cursor)
 
-    for structure in payload.structures:
-        doc_structure = models.DocumentStructure(
-            project_id=project.id,
-            element_type=structure.element_type,
-            title=structure.title,
-            order_index=structure.order_index,
-        )
-        db.add(doc_structure)
-        db.flush()
-        db.add(models.Content(structure_id=doc_structure.id))
 
-    db.commit()
-    db.refresh(project)
-    return project
+@router.post("/", response_model=schemas.ProjectOut, status_code=status.HTTP_201_CREATED)
+async def create_project(
+    payload: schemas.ProjectCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(auth_service.get_current_user),
+):
+    return await db.run_sync(database_service.create_project, current_user.id, payload)
 
 
 @router.get("/{project_id}", response_model=schemas.ProjectOut)
-def get_project(
+async def get_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    include_history: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth_service.get_current_user),
 ):
-    return database_service.get_project_for_user(db, project_id, current_user.id)
+    project = await db.run_sync(
+        database_service.get_project_for_user, project_id, current_user.id, include_history=include_history
+    )
+    return schemas.ProjectOut.model_validate(project, context={"include_history": include_history})
 
 
 @router.put("/{project_id}", response_model=schemas.ProjectOut)
-def update_project(
+async def update_project(
     project_id: int,
     payload: schemas.ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth_service.get_current_user),
 ):
-    project = database_service.get_project_for_user(db, project_id, current_user.id)
-    project.project_name = payload.project_name
-    project.document_type = payload.document_type
-    project.main_topic = payload.main_topic
-
-    db.query(models.DocumentStructure).filter(models.DocumentStructure.project_id == project.id).delete()
-    db.flush()
-
-    for structure in payload.structures:
-        doc_structure = models.DocumentStructure(
-            project_id=project.id,
-            element_type=structure.element_type,
-            title=structure.title,
-            order_index=structure.order_index,
-        )
-        db.add(doc_structure)
-        db.flush()
-        db.add(models.Content(structure_id=doc_structure.id))
-
-    db.commit()
-    db.refresh(project)
-    return project
+    return await db.run_sync(database_service.update_project, project_id, current_user.id, payload)
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(
+async def delete_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(auth_service.get_current_user),
 ):
-    project = database_service.get_project_for_user(db, project_id, current_user.id)
-    db.delete(project)
-    db.commit()
-
-
+    await db.run_sync(database_service.delete_project, project_id, current_user.id)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, ValidationInfo, model_validator
 
 
 class Token(BaseModel):
@@ -43,6 +43,10 @@ class DocumentStructureBase(BaseModel):
     order_index: int
 
 
+class DocumentStructureIn(DocumentStructureBase):
+    id: Optional[int] = None
+
+
 class RefinementHistoryOut(BaseModel):
     id: int
     old_content: Optional[str]
@@ -62,13 +66,22 @@ class ContentOut(BaseModel):
     likes_count: int
     dislikes_count: int
     comments: str
-    history: List[RefinementHistoryOut]
+    history: Optional[List[RefinementHistoryOut]] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
 
+    @model_validator(mode="before")
+    @classmethod
+    def _history_is_opt_in(cls, data, info: ValidationInfo):
+        # Reading ``history`` off an ORM row loads and decodes every revision, so it is only
+        # done when validated with ``context={"include_history": True}``.
+        if isinstance(data, dict) or (info.context or {}).get("include_history"):
+            return data
+        return {name: getattr(data, name) for name in cls.model_fields if name != "history"}
+
 
 class DocumentStructureOut(BaseModel):
     id: int
@@ -83,7 +96,7 @@ class DocumentStructureOut(BaseModel):
 
 
 class ProjectCreate(ProjectBase):
-    structures: List[DocumentStructureBase] = []
+    structures: List[DocumentStructureIn] = []
 
 
 class ProjectOut(ProjectBase):
@@ -96,22 +109,82 @@ class ProjectOut(ProjectBase):
         from_attributes = True
 
 
+class ProjectSummary(BaseModel):
+    id: int
+    project_name: str
+    document_type: str
+    main_topic: str
+    section_count: int
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectSummaryPage(BaseModel):
+    items: List[ProjectSummary]
+    next_cursor: Optional[str] = None
+
+
+class RefinementHistoryPage(BaseModel):
+    items: List[RefinementHistoryOut]
+    next_cursor: Optional[str] = None
+
+
 class GenerateRequest(BaseModel):
     prompt: str
     side_heading: Optional[str] = None
     lines_count: Optional[int] = None
+    use_cache: bool = True
+
+
+class ProjectGenerateRequest(BaseModel):
+    structure_ids: Optional[List[int]] = None
+    prompt: str = ""
+    side_heading: Optional[str] = None
+    lines_count: Optional[int] = None
+    # Capped by GENERATION_MAX_CONCURRENCY; a larger value runs at the operator's cap.
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    use_cache: bool = True
+
+
+class SectionGenerateResult(BaseModel):
+    structure_id: int
+    success: bool
+    error: Optional[str] = None
+
+
+class ProjectGenerateOut(BaseModel):
+    project: ProjectOut
+    results: List[SectionGenerateResult]
 
 
 class RefineRequest(BaseModel):
     prompt: str
     side_heading: Optional[str] = None
     lines_count: Optional[int] = None
+    use_cache: bool = True
 
 
 class FeedbackRequest(BaseModel):
     positive: bool
 
 
+class FeedbackOut(BaseModel):
+    structure_id: int
+    likes_count: int
+    dislikes_count: int
+
+
+class ExportJobOut(BaseModel):
+    id: str
+    project_id: int
+    status: str
+    error: Optional[str] = None
+    status_url: str
+    download_url: Optional[str] = None
+
+
 class CommentRequest(BaseModel):
     comment: str
 
@@ -120,4 +193,5 @@ class OutlineRequest(BaseModel):
     document_type: str
     main_topic: str
     desired_sections: int = Field(default=5, ge=1, le=20)
+    use_cache: bool = True
 
@@ -1,21 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import event
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import schemas
 from app.config import get_settings
-from app.database.connection import get_db
+from app.database.connection import SessionLocal
 from app.models import User
-from app.utils.security import hash_password, verify_password
+from app.utils.security import hash_password_async, verify_and_update_password_async
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
+class _UserCache:
+    """LRU of bearer token -> detached ``User``, valid until the TTL or the token expiry, whichever is first."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, User]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return entry[1]
+
+    def put(self, token: str, user: User, token_expires_at: float) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (min(token_expires_at, time.time() + self.ttl_seconds), user)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_email(self, email: str) -> None:
+        with self._lock:
+            for token in [token for token, (_, user) in self._entries.items() if user.email == email]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = _UserCache(settings.auth_user_cache_ttl_seconds, settings.auth_user_cache_max_entries)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(_mapper, _connection, target: User) -> None:
+    # Only this process is notified; other workers converge within the cache TTL.
+    user_cache.invalidate_email(target.email)
+
+
 def create_access_token(subject: str, expires_minutes: Optional[int] = None) -> tuple[str, datetime]:
     expire_delta = timedelta(minutes=expires_minutes or settings.access_token_expires_minutes)
     expire = datetime.utcnow() + expire_delta
@@ -24,48 +78,80 @@ def create_access_token(subject: str, expires_minutes: Optional[int] = None) ->
     return encoded, expire
 
 
-def decode_access_token(token: str) -> str:
+def _decode_token_claims(token: str) -> tuple[str, float]:
     payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
     subject: Optional[str] = payload.get("sub")
     if not subject:
         raise JWTError("Token subject missing")
-    return subject
+    return subject, float(payload["exp"])
+
+
+def decode_access_token(token: str) -> str:
+    return _decode_token_claims(token)[0]
+
+
+def resolve_user_from_token(token: str) -> Optional[User]:
+    """Decode ``token`` and load its user, serving repeat tokens from ``user_cache``.
+
+    Raises ``JWTError`` for invalid or expired tokens.
+    """
+    user = user_cache.get(token)
+    if user is not None:
+        return user
+    email, expires_at = _decode_token_claims(token)
+    with SessionLocal() as db:
+        user = get_user_by_email(db, email)
+    if user is not None:
+        user_cache.put(token, user, expires_at)
+    return user
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = get_user_by_email(db, email)
+def _save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    """Check credentials with bcrypt in the hashing pool, re-hashing under the current cost policy."""
+    user = await run_in_threadpool(get_user_by_email, db, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await verify_and_update_password_async(password, user.password_hash)
+    if not valid:
         return None
+    if new_hash:
+        user.password_hash = new_hash
+        await run_in_threadpool(_save_user, db, user)
     return user
 
 
-def register_user(db: Session, user_in: schemas.UserCreate) -> User:
-    hashed = hash_password(user_in.password)
+async def register_user(db: Session, user_in: schemas.UserCreate) -> User:
+    hashed = await hash_password_async(user_in.password)
     user = User(email=user_in.email, password_hash=hashed)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    return await run_in_threadpool(_save_user, db, user)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        email = decode_access_token(token)
-    except JWTError as exc:
-        raise credentials_exception from exc
+    # AuthMiddleware has normally resolved this token already; only redo it when it has not.
+    if getattr(request.state, "auth_token", None) == token:
+        user = request.state.user
+    else:
+        try:
+            user = await run_in_threadpool(resolve_user_from_token, token)
+        except JWTError as exc:
+            raise credentials_exception from exc
 
-    user = get_user_by_email(db, email=email)
     if user is None:
         raise credentials_exception
     return user
@@ -0,0 +1,348 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import get_settings
+from app.database.connection import SessionLocal
+from app.models import PromptCacheEntry
+from app.utils.metrics import REGISTRY
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Trimming the DB tier scans the whole table, so only do it every N writes.
+_PRUNE_EVERY = 100
+# DB-tier hit bookkeeping (hit_count, last_used_at) is written in one batch every N hits.
+_FLUSH_HITS_EVERY = 50
+# Project id and content version at the start of an export cache key.
+_EXPORT_KEY = re.compile(r"(\d+)-(\d+)-")
+
+export_cache_lookups_total = REGISTRY.counter(
+    "export_cache_lookups_total",
+    "Export downloads by how they were served: not_modified, memory, disk or miss (rendered).",
+    ("result",),
+)
+
+
+class PromptCache:
+    """Two-tier (in-process LRU + database) cache of model responses keyed by prompt hash.
+
+    A DB-tier hit is a plain read; its ``hit_count``/``last_used_at`` bookkeeping is
+    buffered and written in batches, best effort, so hot keys do not contend for row locks.
+    """
+
+    def __init__(self, memory_entries: int, db_entries: int, ttl_seconds: int):
+        self.memory_entries = memory_entries
+        self.db_entries = db_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        # cache_key -> [hits, last used] not yet written to the DB tier.
+        self._pending_hits: dict[str, list] = {}
+        self._pending_hit_total = 0
+        self.counters = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached and now - cached[0] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return cached[1]
+            if cached:
+                del self._memory[key]
+
+        text = self._db_get(key)
+        with self._lock:
+            if text is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["db_hits"] += 1
+        self._remember(key, text, now)
+        return text
+
+    def put(self, key: str, model_name: str, text: str) -> None:
+        self._remember(key, text, time.time())
+        self._db_put(key, model_name, text)
+        with self._lock:
+            self.counters["stores"] += 1
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["db_hits"] + self.counters["misses"]
+            hits = self.counters["memory_hits"] + self.counters["db_hits"]
+            return {
+                **self.counters,
+                "memory_size": len(self._memory),
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remember(self, key: str, text: str, stored_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (stored_at, text)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _db_get(self, key: str) -> Optional[str]:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        try:
+            with SessionLocal() as db:
+                entry = db.execute(
+                    select(PromptCacheEntry.response_text, PromptCacheEntry.created_at).where(
+                        PromptCacheEntry.cache_key == key
+                    )
+                ).first()
+        except SQLAlchemyError:
+            logger.exception("Prompt cache lookup failed")
+            self._record_error()
+            return None
+        if entry is None or entry.created_at < cutoff:
+            return None
+        self._record_hit(key)
+        return entry.response_text
+
+    def _record_hit(self, key: str) -> None:
+        with self._lock:
+            pending = self._pending_hits.setdefault(key, [0, None])
+            pending[0] += 1
+            pending[1] = datetime.utcnow()
+            self._pending_hit_total += 1
+            should_flush = self._pending_hit_total >= _FLUSH_HITS_EVERY
+        if should_flush:
+            self.flush_hits()
+
+    def flush_hits(self) -> None:
+        """Write buffered hit bookkeeping with one batched UPDATE; failures only cost LRU accuracy."""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+            self._pending_hit_total = 0
+        if not pending:
+            return
+        table = PromptCacheEntry.__table__
+        statement = (
+            update(table)
+            .where(table.c.cache_key == bindparam("key"))
+            .values(hit_count=table.c.hit_count + bindparam("hits"), last_used_at=bindparam("last_used"))
+        )
+        rows = [{"key": key, "hits": hits, "last_used": last_used} for key, (hits, last_used) in sorted(pending.items())]
+        try:
+            with SessionLocal() as db:
+                db.connection().execute(statement, rows)
+                db.commit()
+        except SQLAlchemyError:
+            # Not a lookup error: every hit was already served.
+            logger.warning("Prompt cache hit bookkeeping failed for %d keys", len(rows), exc_info=True)
+
+    def _db_put(self, key: str, model_name: str, text: str) -> None:
+        try:
+            with SessionLocal() as db:
+                entry = db.execute(
+                    select(PromptCacheEntry).where(PromptCacheEntry.cache_key == key)
+                ).scalar_one_or_none()
+                now = datetime.utcnow()
+                if entry is None:
+                    db.add(PromptCacheEntry(cache_key=key, model_name=model_name, response_text=text))
+                else:
+                    entry.response_text = text
+                    entry.created_at = now
+                    entry.last_used_at = now
+                db.commit()
+        except SQLAlchemyError:
+            # A concurrent writer may have stored the same key first; the cache is best effort.
+            logger.warning("Prompt cache store failed for key %s", key, exc_info=True)
+            self._record_error()
+            return
+
+        with self._lock:
+            self._writes += 1
+            should_prune = self._writes % _PRUNE_EVERY == 0
+        if should_prune:
+            self.prune()
+
+    def prune(self) -> None:
+        """Drop expired rows, then the least recently used rows above ``db_entries``."""
+        self.flush_hits()
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        try:
+            with SessionLocal() as db:
+                db.execute(delete(PromptCacheEntry).where(PromptCacheEntry.created_at < cutoff))
+                stale_ids = db.execute(
+                    select(PromptCacheEntry.id)
+                    .order_by(PromptCacheEntry.last_used_at.desc())
+                    .offset(self.db_entries)
+                ).scalars().all()
+                if stale_ids:
+                    db.execute(delete(PromptCacheEntry).where(PromptCacheEntry.id.in_(stale_ids)))
+                db.commit()
+        except SQLAlchemyError:
+            logger.exception("Prompt cache prune failed")
+            self._record_error()
+
+    def _record_error(self) -> None:
+        with self._lock:
+            self.counters["errors"] += 1
+
+
+prompt_cache = PromptCache(
+    memory_entries=settings.prompt_cache_memory_entries,
+    db_entries=settings.prompt_cache_db_entries,
+    ttl_seconds=settings.prompt_cache_ttl_seconds,
+)
+
+
+class ExportCache:
+    """Rendered exports keyed by project content version, bounded by total size.
+
+    The in-process tier is an LRU capped at ``max_bytes``. With ``directory`` set, renders
+    are also written there (capped at ``disk_max_bytes``, oldest evicted first) so every
+    worker sharing the directory can reuse them. Storing a version of a project drops its
+    renders of lower versions, which can never be requested again; a slow render of an old
+    version finishing late leaves the newer ones alone.
+    """
+
+    def __init__(self, max_bytes: int, directory: str = "", disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {"not_modified": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(project_id: int, content_version: int, document_type: str, template_signature: str) -> str:
+        return f"{project_id}-{content_version}-{document_type}-{template_signature}"
+
+    def record_not_modified(self) -> None:
+        self._count("not_modified", "not_modified")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+        if payload is not None:
+            self._count("memory_hits", "memory")
+            return payload
+
+        payload = self._disk_get(key) if self.directory else None
+        if payload is None:
+            self._count("misses", "miss")
+            return None
+        self._count("disk_hits", "disk")
+        self._remember(key, payload)
+        return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        self._remember(key, payload)
+        if self.directory:
+            self._disk_put(key, payload)
+        with self._lock:
+            self.counters["stores"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "memory_entries": len(self._memory), "memory_bytes": self._memory_bytes}
+
+    def _count(self, counter: str, result: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+        export_cache_lookups_total.inc(result=result)
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            for stale in [other for other in self._memory if _superseded(other, key)]:
+                self._memory_bytes -= len(self._memory.pop(stale))
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = payload
+            self._memory_bytes += len(payload)
+            while self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as handle:
+                payload = handle.read()
+            os.utime(path)  # mtime is the recency the disk tier evicts by
+            return payload
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.exception("Export cache read failed for %s", key)
+            self._record_error()
+            return None
+
+    def _disk_put(self, key: str, payload: bytes) -> None:
+        path = os.path.join(self.directory, key)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "wb") as handle:
+                handle.write(payload)
+            # Readers in other workers see either no file or a complete one.
+            os.replace(temporary, path)
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".tmp"):
+                    continue
+                if _superseded(entry.name, key):
+                    os.remove(entry.path)
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, stale_path in sorted(entries):
+                if total <= self.disk_max_bytes:
+                    break
+                os.remove(stale_path)
+                total -= size
+        except FileNotFoundError:
+            # Another worker evicted the same file first.
+            pass
+        except OSError:
+            logger.exception("Export cache write failed for %s", key)
+            self._record_error()
+
+    def _record_error(self) -> None:
+        with self._lock:
+            self.counters["errors"] += 1
+
+
+def _superseded(other: str, key: str) -> bool:
+    """Whether ``other`` renders the same project as ``key`` at a lower content version."""
+    mine, theirs = _EXPORT_KEY.match(key), _EXPORT_KEY.match(other)
+    return theirs is not None and theirs[1] == mine[1] and int(theirs[2]) < int(mine[2])
+
+
+export_cache = ExportCache(
+    max_bytes=settings.export_cache_max_bytes,
+    directory=settings.export_cache_dir,
+    disk_max_bytes=settings.export_cache_disk_max_bytes,
+)
@@ -1,25 +1,148 @@
+import base64
+from datetime import datetime
+from typing import Optional, Sequence
+
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, exists, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app import schemas
+from app.models import Content, DocumentStructure, Project, RefinementHistory
+from app.models.content import decode_history
 
-from app.models import DocumentStructure, Project
 
+def _project_tree_options(include_history: bool = False):
+    # One SELECT per level (projects, structures, content[, history]) regardless of project size.
+    content = selectinload(Project.structures).selectinload(DocumentStructure.content)
+    return (content.selectinload(Content.history),) if include_history else (content,)
 
-def get_project_for_user(db: Session, project_id: int, user_id: int) -> Project:
-    project = (
+
+def get_project_for_user(
+    db: Session,
+    project_id: int,
+    user_id: int,
+    load_tree: bool = True,
+    include_history: bool = False,
+) -> Project:
+    # populate_existing: sessions that keep objects across commits must still see fresh rows.
+    query = (
         db.query(Project)
         .filter(Project.id == project_id, Project.user_id == user_id)
-        .first()
+        .populate_existing()
     )
+    if load_tree:
+        query = query.options(*_project_tree_options(include_history))
+    project = query.first()
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     return project
 
 
-def get_structure_for_user(db: Session, structure_id: int, user_id: int) -> DocumentStructure:
+def get_export_version(db: Session, project_id: int, user_id: int):
+    """``(project_name, document_type, content_version, section_count)`` in one query.
+
+    Enough to answer a conditional request, find a cached render, or decide whether the
+    export is small enough to render inline.
+    """
+    section_count = (
+        select(func.count(DocumentStructure.id)).where(DocumentStructure.project_id == Project.id).scalar_subquery()
+    )
+    row = db.execute(
+        select(Project.project_name, Project.document_type, Project.content_version, section_count).where(
+            Project.id == project_id, Project.user_id == user_id
+        )
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return row
+
+
+def list_projects_for_user(db: Session, user_id: int, include_history: bool = False) -> list[Project]:
+    return (
+        db.query(Project)
+        .options(*_project_tree_options(include_history))
+        .filter(Project.user_id == user_id)
+        .order_by(Project.updated_at.desc())
+        .populate_existing()
+        .all()
+    )
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def list_project_summaries(
+    db: Session,
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    document_type: Optional[str] = None,
+) -> tuple[list, Optional[str]]:
+    """Return one page of project summaries, newest first, plus the cursor for the next page."""
+    section_count = (
+        select(func.count(DocumentStructure.id))
+        .where(DocumentStructure.project_id == Project.id)
+        .correlate(Project)
+        .scalar_subquery()
+    )
+    query = (
+        select(
+            Project.id,
+            Project.project_name,
+            Project.document_type,
+            Project.main_topic,
+            Project.updated_at,
+            section_count.label("section_count"),
+        )
+        .where(Project.user_id == user_id)
+        .order_by(Project.updated_at.desc(), Project.id.desc())
+        .limit(limit + 1)
+    )
+    if document_type:
+        query = query.where(Project.document_type == document_type)
+    if cursor:
+        cursor_updated_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                Project.updated_at < cursor_updated_at,
+                and_(Project.updated_at == cursor_updated_at, Project.id < cursor_id),
+            )
+        )
+
+    rows = db.execute(query).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].updated_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def get_structure_for_user(
+    db: Session,
+    structure_id: int,
+    user_id: int,
+    include_history: bool = False,
+) -> DocumentStructure:
+    content = selectinload(DocumentStructure.content)
     structure = (
         db.query(DocumentStructure)
         .join(Project, Project.id == DocumentStructure.project_id)
+        .options(
+            joinedload(DocumentStructure.project),
+            content.selectinload(Content.history) if include_history else content,
+        )
         .filter(DocumentStructure.id == structure_id, Project.user_id == user_id)
+        .populate_existing()
         .first()
     )
     if not structure:
@@ -27,3 +150,253 @@ def get_structure_for_user(db: Session, structure_id: int, user_id: int) -> Docu
     return structure
 
 
+def _history_before(created_at: datetime, row_id: int, inclusive: bool = False):
+    id_bound = RefinementHistory.id <= row_id if inclusive else RefinementHistory.id < row_id
+    return or_(
+        RefinementHistory.created_at < created_at,
+        and_(RefinementHistory.created_at == created_at, id_bound),
+    )
+
+
+def get_history_tail(db: Session, content_id: int) -> list[RefinementHistory]:
+    """A section's history from its latest snapshot onward: all a new revision is encoded against."""
+    snapshot = db.execute(
+        select(RefinementHistory.created_at, RefinementHistory.id)
+        .where(RefinementHistory.content_id == content_id, RefinementHistory.base_content.is_not(None))
+        .order_by(RefinementHistory.created_at.desc(), RefinementHistory.id.desc())
+        .limit(1)
+    ).first()
+    if snapshot is None:
+        return []
+    return list(
+        db.scalars(
+            select(RefinementHistory)
+            .where(RefinementHistory.content_id == content_id, ~_history_before(snapshot.created_at, snapshot.id))
+            .order_by(RefinementHistory.created_at, RefinementHistory.id)
+        )
+    )
+
+
+def list_history_for_user(
+    db: Session,
+    structure_id: int,
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> tuple[list[RefinementHistory], Optional[str]]:
+    """Return one page of a section's refinement history, newest first, plus the next cursor.
+
+    Only the page and the delta chain back to its nearest snapshot are read and decoded.
+    """
+    structure = get_structure_for_user(db, structure_id, user_id)
+    if not structure.content:
+        return [], None
+    content_id = structure.content.id
+    query = (
+        select(RefinementHistory)
+        .where(RefinementHistory.content_id == content_id)
+        .order_by(RefinementHistory.created_at.desc(), RefinementHistory.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(_history_before(cursor_created_at, cursor_id))
+    page = list(db.scalars(query))
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id)
+    if not page:
+        return page, next_cursor
+
+    newest, oldest = page[0], page[-1]
+    snapshot = db.execute(
+        select(RefinementHistory.created_at, RefinementHistory.id)
+        .where(
+            RefinementHistory.content_id == content_id,
+            RefinementHistory.base_content.is_not(None),
+            _history_before(oldest.created_at, oldest.id, inclusive=True),
+        )
+        .order_by(RefinementHistory.created_at.desc(), RefinementHistory.id.desc())
+        .limit(1)
+    ).first()
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Refinement history is corrupt")
+    chain = db.scalars(
+        select(RefinementHistory)
+        .where(
+            RefinementHistory.content_id == content_id,
+            ~_history_before(snapshot.created_at, snapshot.id),
+            _history_before(newest.created_at, newest.id, inclusive=True),
+        )
+        .order_by(RefinementHistory.created_at, RefinementHistory.id)
+    ).all()
+    # The page rows are the same identity-mapped objects, so decoding the chain fills them in.
+    decode_history(chain)
+    return page, next_cursor
+
+
+def create_project(db: Session, user_id: int, payload: schemas.ProjectCreate) -> Project:
+    project = Project(
+        user_id=user_id,
+        project_name=payload.project_name,
+        document_type=payload.document_type,
+        main_topic=payload.main_topic,
+    )
+    db.add(project)
+    db.flush()
+    insert_structures(db, project.id, payload.structures)
+    db.commit()
+    return get_project_for_user(db, project.id, user_id)
+
+
+def update_project(db: Session, project_id: int, user_id: int, payload: schemas.ProjectCreate) -> Project:
+    project = get_project_for_user(db, project_id, user_id, load_tree=False)
+    project.project_name = payload.project_name
+    project.document_type = payload.document_type
+    project.main_topic = payload.main_topic
+
+    if sync_project_structures(db, project, payload.structures):
+        project.updated_at = datetime.utcnow()
+    db.commit()
+    return get_project_for_user(db, project.id, user_id)
+
+
+def delete_project(db: Session, project_id: int, user_id: int) -> None:
+    project = get_project_for_user(db, project_id, user_id)
+    db.delete(project)
+    db.commit()
+
+
+def insert_structures(db: Session, project_id: int, structures: Sequence[schemas.DocumentStructureBase]) -> None:
+    """Insert structures and their empty content rows with two statements, whatever the count."""
+    if not structures:
+        return
+    db.execute(
+        insert(DocumentStructure),
+        [
+            {
+                "project_id": project_id,
+                "element_type": structure.element_type,
+                "title": structure.title,
+                "order_index": structure.order_index,
+            }
+            for structure in structures
+        ],
+    )
+    now = datetime.utcnow()
+    missing_content = (
+        select(
+            DocumentStructure.id,
+            literal(""),
+            literal(""),
+            literal(0),
+            literal(0),
+            literal(""),
+            literal(now),
+            literal(now),
+        )
+        .where(DocumentStructure.project_id == project_id)
+        .where(~exists().where(Content.structure_id == DocumentStructure.id))
+    )
+    db.execute(
+        insert(Content).from_select(
+            [
+                Content.structure_id,
+                Content.generated_content,
+                Content.refinement_prompt,
+                Content.likes_count,
+                Content.dislikes_count,
+                Content.comments,
+                Content.created_at,
+                Content.updated_at,
+            ],
+            missing_content,
+        )
+    )
+
+
+def delete_structures(db: Session, structure_ids: Sequence[int]) -> None:
+    # Bulk deletes bypass ORM cascades, and SQLite does not enforce ON DELETE CASCADE by default.
+    if not structure_ids:
+        return
+    content_ids = select(Content.id).where(Content.structure_id.in_(structure_ids))
+    db.execute(
+        delete(RefinementHistory).where(RefinementHistory.content_id.in_(content_ids)),
+        execution_options={"synchronize_session": False},
+    )
+    db.execute(
+        delete(Content).where(Content.structure_id.in_(structure_ids)),
+        execution_options={"synchronize_session": False},
+    )
+    db.execute(
+        delete(DocumentStructure).where(DocumentStructure.id.in_(structure_ids)),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def sync_project_structures(
+    db: Session,
+    project: Project,
+    incoming: Sequence[schemas.DocumentStructureIn],
+) -> bool:
+    """Reconcile a project's structures with ``incoming`` using bulk statements.
+
+    Incoming items match existing rows by ``id`` when given, otherwise by title. Matched
+    rows are updated in place (keeping their content and history), unmatched incoming
+    items are inserted and unmatched existing rows are deleted. Returns whether anything
+    changed.
+    """
+    existing = {
+        row.id: row
+        for row in db.execute(
+            select(
+                DocumentStructure.id,
+                DocumentStructure.element_type,
+                DocumentStructure.title,
+                DocumentStructure.order_index,
+            )
+            .where(DocumentStructure.project_id == project.id)
+            .order_by(DocumentStructure.order_index)
+        )
+    }
+
+    explicit_ids = [item.id for item in incoming if item.id is not None]
+    if len(explicit_ids) != len(set(explicit_ids)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Duplicate structure ids")
+    unknown = set(explicit_ids) - existing.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Structures do not belong to this project: {sorted(unknown)}",
+        )
+
+    unmatched = [row_id for row_id in existing if row_id not in set(explicit_ids)]
+    by_title: dict[str, list[int]] = {}
+    for row_id in unmatched:
+        by_title.setdefault(existing[row_id].title, []).append(row_id)
+
+    matches: list[tuple[int, schemas.DocumentStructureIn]] = []
+    to_insert = []
+    for item in incoming:
+        if item.id is not None:
+            matches.append((item.id, item))
+        elif by_title.get(item.title):
+            matches.append((by_title[item.title].pop(0), item))
+        else:
+            to_insert.append(item)
+
+    matched_ids = {row_id for row_id, _ in matches}
+    to_delete = [row_id for row_id in existing if row_id not in matched_ids]
+    to_update = [
+        {"id": row_id, "element_type": item.element_type, "title": item.title, "order_index": item.order_index}
+        for row_id, item in matches
+        if (existing[row_id].element_type, existing[row_id].title, existing[row_id].order_index)
+        != (item.element_type, item.title, item.order_index)
+    ]
+
+    delete_structures(db, to_delete)
+    if to_update:
+        db.execute(update(DocumentStructure), to_update)
+    insert_structures(db, project.id, to_insert)
+    return bool(to_delete or to_update or to_insert)
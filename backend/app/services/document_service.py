@@ -1,37 +1,143 @@
+import copy
+import hashlib
 import io
+import os
+import threading
+from functools import lru_cache
 from typing import Iterable
 
-from docx import Document
-from pptx import Presentation
-
+from app.config import get_settings
 from app.models import DocumentStructure, Project
+from app.utils import tracing
 
+settings = get_settings()
 
-def export_docx(project: Project, structures: Iterable[DocumentStructure]) -> bytes:
-    doc = Document()
-    doc.add_heading(project.project_name, level=1)
-    for structure in sorted(structures, key=lambda s: s.order_index):
-        doc.add_heading(structure.title, level=2)
-        body = structure.content.generated_content if structure.content else "Content pending."
-        doc.add_paragraph(body)
+# (title, body) pairs: plain values, so renders can run in another process.
+Section = tuple[str, str]
+
+# Parsed templates, cloned per export instead of re-reading the template package every time.
+_templates: dict = {}
+_templates_lock = threading.Lock()
+
+
+def export_docx(project: Project, structures: Iterable[DocumentStructure]) -> memoryview:
+    """Render ``structures`` (already in ``order_index`` order) as a Word document."""
+    with tracing.span("export.docx", project_id=project.id) as span:
+        payload = _save(_render_docx(project.project_name, sections_of(structures)))
+        if span is not None:
+            span.set(bytes=len(payload))
+        return payload
+
+
+def sections_of(structures: Iterable[DocumentStructure]) -> list[Section]:
+    return [
+        (structure.title, structure.content.generated_content if structure.content else "Content pending.")
+        for structure in structures
+    ]
+
+
+def warm_up() -> None:
+    """Import the rendering libraries and parse the templates now instead of on the first export."""
+    load_templates()
+
+
+def load_templates() -> None:
+    for kind in ("docx", "pptx"):
+        _template(kind)
+
+
+@lru_cache
+def template_signature(kind: str) -> str:
+    """Identifies the template exports of ``kind`` are rendered from, for cache keys.
+
+    Read once per process, like the parsed template itself, and without importing the
+    rendering libraries.
+    """
+    path = settings.export_docx_template if kind == "docx" else settings.export_pptx_template
+    if not path:
+        return "default"
+    stat = os.stat(path)
+    return hashlib.sha256(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
+
+def _load_template(kind: str):
+    # python-docx and python-pptx take a noticeable share of start-up, so load them on first use.
+    if kind == "docx":
+        from docx import Document
+
+        return Document(settings.export_docx_template or None)
+
+    from pptx import Presentation
+
+    return Presentation(settings.export_pptx_template or None)
+
+
+def _template(kind: str):
+    template = _templates.get(kind)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(kind)
+            if template is None:
+                template = _templates[kind] = _load_template(kind)
+    return template
+
+
+def _content_layout(prs):
+    """The first layout with a title and a body placeholder; index 1 in the default template."""
+    for layout in prs.slide_layouts:
+        indexes = {placeholder.placeholder_format.idx for placeholder in layout.placeholders}
+        if {0, 1} <= indexes:
+            return layout
+    return prs.slide_layouts[1]
+
+
+def _save(document) -> memoryview:
     buffer = io.BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
-    return buffer.read()
+    document.save(buffer)
+    # A view of the buffer's memory; the response sends it without another copy.
+    return buffer.getbuffer()
+
+
+def _render_docx(project_name: str, sections: list[Section]):
+    doc = copy.deepcopy(_template("docx"))
+    doc.add_heading(project_name, level=1)
+    # add_heading resolves the style by name, scanning every style in the template, on each
+    # call; resolve it once and set the id on the paragraph element directly.
+    heading_style = doc.styles["Heading 2"].style_id
+    for title, body in sections:
+        doc.add_paragraph(title)._p.style = heading_style
+        doc.add_paragraph(body)
+    return doc
 
 
-def export_pptx(project: Project, structures: Iterable[DocumentStructure]) -> bytes:
-    prs = Presentation()
-    for structure in sorted(structures, key=lambda s: s.order_index):
-        slide_layout = prs.slide_layouts[1]
+def export_pptx(project: Project, structures: Iterable[DocumentStructure]) -> memoryview:
+    """Render ``structures`` (already in ``order_index`` order) as a PowerPoint deck."""
+    with tracing.span("export.pptx", project_id=project.id) as span:
+        payload = _save(_render_pptx(project.project_name, sections_of(structures)))
+        if span is not None:
+            span.set(bytes=len(payload))
+        return payload
+
+
+def _render_pptx(project_name: str, sections: list[Section]):
+    prs = copy.deepcopy(_template("pptx"))
+    slide_layout = _content_layout(prs)
+    for title, body in sections:
         slide = prs.slides.add_slide(slide_layout)
-        slide.shapes.title.text = structure.title
-        content = structure.content.generated_content if structure.content else "Content pending."
+        slide.shapes.title.text = title
         placeholder = slide.shapes.placeholders[1]
-        placeholder.text = content
-    buffer = io.BytesIO()
-    prs.save(buffer)
-    buffer.seek(0)
-    return buffer.read()
+        placeholder.text = body
+    return prs
+
 
+def render_to_file(document_type: str, project_name: str, sections: list[Section], path: str) -> int:
+    """Render to ``path`` and return its size; runs in the export process pool.
 
+    The file is written under a temporary name and renamed when complete, so its existence
+    means the export is finished.
+    """
+    render = _render_docx if document_type == "docx" else _render_pptx
+    temporary = f"{path}.tmp"
+    render(project_name, sections).save(temporary)
+    os.replace(temporary, path)
+    return os.path.getsize(path)
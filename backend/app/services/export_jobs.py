@@ -0,0 +1,214 @@
+import json
+import logging
+import multiprocessing
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+from app.models import Project
+from app.services import document_service
+from app.services.cache_service import export_cache
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class ExportJobManager:
+    """Renders exports in a process pool so large decks never block a request worker.
+
+    Job state lives in ``directory``, not in memory, so any worker sharing it can answer a
+    poll or serve the download: ``<id>.json`` holds the job's metadata, the rendered file
+    appears as ``<id>.<format>`` once complete and ``<id>.error`` records a failure.
+    ``<cache_key>.key`` names the latest job for a cache key, so repeated requests for the
+    same render join it instead of queueing another. A job
+    whose owning worker has exited, or that is still unfinished ``timeout_seconds`` after
+    creation, is reported as failed. Jobs and their files are removed ``ttl_seconds`` after
+    creation.
+    """
+
+    def __init__(self, directory: str, workers: int, ttl_seconds: int, timeout_seconds: int):
+        # The default is per host, so workers of one deployment on the same machine share it.
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "document-export-jobs")
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that holds DB connections and running threads is unsafe.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=document_service.warm_up,
+                )
+            return self._executor
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.{suffix}")
+
+    def _key_path(self, cache_key: str) -> str:
+        return self._path(cache_key, "key")
+
+    def submit(self, project: Project, user_id: int, cache_key: str, payload: Optional[bytes] = None) -> dict:
+        """Queue a render of ``project``; with ``payload`` (a cached render) the job is done at once.
+
+        Without a payload, an unfailed job for the same ``cache_key`` is returned instead.
+        """
+        with self._submit_lock:
+            if payload is None:
+                existing = self.find(cache_key, user_id)
+                if existing is not None:
+                    return existing
+            return self._create(project, user_id, cache_key, payload)
+
+    def find(self, cache_key: str, user_id: int) -> Optional[dict]:
+        """The pending or finished job for ``cache_key``, or ``None`` when there is none or it failed."""
+        try:
+            with open(self._key_path(cache_key), encoding="utf-8") as handle:
+                job = self.get(handle.read(), user_id)
+        except (FileNotFoundError, HTTPException):
+            return None
+        return None if job["status"] == "failed" else job
+
+    def _create(self, project: Project, user_id: int, cache_key: str, payload: Optional[bytes]) -> dict:
+        self.prune()
+        # Created here rather than at import, and again if a temp cleaner removed it.
+        os.makedirs(self.directory, exist_ok=True)
+        job = {
+            "id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "project_id": project.id,
+            "document_type": project.document_type,
+            "filename": f"{project.project_name}.{project.document_type}",
+            "cache_key": cache_key,
+            "created_at": time.time(),
+            # The worker whose pool renders the job; its callback records the outcome.
+            "owner_host": socket.gethostname(),
+            "owner_pid": os.getpid(),
+        }
+        self._write(self._path(job["id"], "json"), json.dumps(job).encode("utf-8"))
+        result_path = self._path(job["id"], job["document_type"])
+        if payload is not None:
+            self._write(result_path, payload)
+        else:
+            future = self._pool().submit(
+                document_service.render_to_file,
+                project.document_type,
+                project.project_name,
+                document_service.sections_of(project.structures),
+                result_path,
+            )
+            future.add_done_callback(lambda done: self._finished(job, done))
+        self._write(self._key_path(cache_key), job["id"].encode("utf-8"))
+        return self.status(job)
+
+    def get(self, job_id: str, user_id: int) -> dict:
+        job = None
+        if _JOB_ID.fullmatch(job_id):
+            try:
+                with open(self._path(job_id, "json"), encoding="utf-8") as handle:
+                    job = json.load(handle)
+            except FileNotFoundError:
+                pass
+        if job is None or job["user_id"] != user_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+        return self.status(job)
+
+    def status(self, job: dict) -> dict:
+        result_path = self._path(job["id"], job["document_type"])
+        error = None
+        if os.path.exists(result_path):
+            state = "done"
+        elif os.path.exists(self._path(job["id"], "error")):
+            state = "failed"
+            with open(self._path(job["id"], "error"), encoding="utf-8") as handle:
+                error = handle.read()
+        else:
+            state, error = "pending", self._stalled(job)
+            if error is not None:
+                state = "failed"
+        return {**job, "status": state, "error": error, "path": result_path}
+
+    def _stalled(self, job: dict) -> Optional[str]:
+        """Why a pending job will never finish, or ``None`` while it still can."""
+        if time.time() - job["created_at"] > self.timeout_seconds:
+            return f"Export did not finish within {self.timeout_seconds} seconds"
+        if job.get("owner_host") == socket.gethostname() and not _process_alive(job["owner_pid"]):
+            return "Export worker exited before the job finished"
+        return None
+
+    def _finished(self, job: dict, future: Future) -> None:
+        if future.cancelled():
+            self._write(self._path(job["id"], "error"), b"Export was cancelled")
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error("Export job %s failed", job["id"], exc_info=error)
+            self._write(self._path(job["id"], "error"), f"{type(error).__name__}: {error}".encode("utf-8"))
+            return
+        # Later synchronous downloads of the same version can come from the export cache.
+        if future.result() <= export_cache.max_bytes:
+            with open(self._path(job["id"], job["document_type"]), "rb") as handle:
+                export_cache.put(job["cache_key"], handle.read())
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(data)
+        os.replace(temporary, path)
+
+    def prune(self) -> None:
+        """Delete jobs, finished or not, and cache key entries older than the TTL."""
+        cutoff = time.time() - self.ttl_seconds
+        try:
+            expired = {
+                entry.name.split(".", 1)[0]
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith((".json", ".key")) and entry.stat().st_mtime < cutoff
+            }
+            for entry in os.scandir(self.directory):
+                if entry.name.split(".", 1)[0] in expired:
+                    os.remove(entry.path)
+        except FileNotFoundError:
+            # No job was created yet, or another worker pruned the same job first.
+            pass
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+export_jobs = ExportJobManager(
+    directory=settings.export_job_dir,
+    workers=settings.export_workers,
+    ttl_seconds=settings.export_job_ttl_seconds,
+    timeout_seconds=settings.export_job_timeout_seconds,
+)
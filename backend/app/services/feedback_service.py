@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database.connection import engine
+from app.models import Content, DocumentStructure, Project
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Re-reads allowed when a flush races a buffered vote's read; after that the counts are best effort.
+_CONSISTENT_READ_ATTEMPTS = 3
+
+
+class FeedbackBuffer:
+    """Write-behind aggregation of votes, applied as one batched UPDATE per interval.
+
+    Counts live in this process until flushed, so a crash loses at most one interval of
+    votes and other workers only see them after the flush. ``sequence`` is odd while a
+    flush is writing and changes with every flush, so a reader can tell whether a stored
+    row it read may already include votes it also sees as pending.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._pending: dict[int, list[int]] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def sequence(self) -> int:
+        with self._lock:
+            return self._sequence
+
+    def add(self, content_id: int, positive: bool) -> tuple[int, int, int]:
+        """Buffer one vote; returns the pending (likes, dislikes) for that content and ``sequence``."""
+        with self._lock:
+            counts = self._pending.setdefault(content_id, [0, 0])
+            counts[0 if positive else 1] += 1
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="feedback-flush", daemon=True)
+                self._worker.start()
+            return counts[0], counts[1], self._sequence
+
+    def pending(self, content_id: int) -> tuple[int, int, int]:
+        """The pending (likes, dislikes) for ``content_id`` and ``sequence``."""
+        with self._lock:
+            likes, dislikes = self._pending.get(content_id, (0, 0))
+            return likes, dislikes, self._sequence
+
+    def flush(self) -> int:
+        """Apply every buffered vote; returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if pending:
+                    self._sequence += 1
+            if not pending:
+                return 0
+            try:
+                return self._write(pending)
+            finally:
+                with self._lock:
+                    self._sequence += 1
+
+    def _write(self, pending: dict[int, list[int]]) -> int:
+        table = Content.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("content_id"))
+            .values(
+                likes_count=table.c.likes_count + bindparam("likes"),
+                dislikes_count=table.c.dislikes_count + bindparam("dislikes"),
+            )
+        )
+        rows = [
+            {"content_id": content_id, "likes": likes, "dislikes": dislikes}
+            for content_id, (likes, dislikes) in sorted(pending.items())
+        ]
+        try:
+            with engine.begin() as conn:
+                conn.execute(statement, rows)
+        except SQLAlchemyError:
+            logger.exception("Feedback flush failed; %d rows re-queued", len(rows))
+            with self._lock:
+                for content_id, (likes, dislikes) in pending.items():
+                    counts = self._pending.setdefault(content_id, [0, 0])
+                    counts[0] += likes
+                    counts[1] += dislikes
+            return 0
+        return sum(likes + dislikes for likes, dislikes in pending.values())
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            self.flush()
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.interval_seconds + 5)
+        self.flush()
+
+
+feedback_buffer: Optional[FeedbackBuffer] = (
+    FeedbackBuffer(settings.feedback_flush_interval_seconds) if settings.feedback_write_behind else None
+)
+
+
+def _owned_structure_ids(user_id: int):
+    return (
+        select(DocumentStructure.id)
+        .join(Project, Project.id == DocumentStructure.project_id)
+        .where(Project.user_id == user_id)
+    )
+
+
+def _load_counters(db: Session, structure_id: int, user_id: int):
+    row = db.execute(
+        select(Content.id, Content.likes_count, Content.dislikes_count)
+        .select_from(DocumentStructure)
+        .join(Project, Project.id == DocumentStructure.project_id)
+        .outerjoin(Content, Content.structure_id == DocumentStructure.id)
+        .where(DocumentStructure.id == structure_id, Project.user_id == user_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Structure not found")
+    if row.id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Content not generated yet")
+    return row
+
+
+def _buffered_vote(db: Session, structure_id: int, user_id: int, positive: bool) -> tuple[int, int]:
+    sequence = feedback_buffer.sequence
+    row = _load_counters(db, structure_id, user_id)
+    pending_likes, pending_dislikes, current = feedback_buffer.add(row.id, positive)
+    for _ in range(_CONSISTENT_READ_ATTEMPTS):
+        if current == sequence and sequence % 2 == 0:
+            break
+        # A flush ran while the row was read, so the row may hold votes also counted as
+        # pending. End the transaction so the next read sees the flush, and read both again.
+        db.rollback()
+        time.sleep(0.005)
+        sequence = feedback_buffer.sequence
+        row = _load_counters(db, structure_id, user_id)
+        pending_likes, pending_dislikes, current = feedback_buffer.pending(row.id)
+    return row.likes_count + pending_likes, row.dislikes_count + pending_dislikes
+
+
+def record_feedback(db: Session, structure_id: int, user_id: int, positive: bool) -> dict:
+    """Count one vote and return the section's current counters."""
+    if feedback_buffer is not None:
+        likes, dislikes = _buffered_vote(db, structure_id, user_id, positive)
+    else:
+        # A single UPDATE ... SET n = n + 1: the database serialises concurrent votes, none are lost.
+        column = Content.likes_count if positive else Content.dislikes_count
+        result = db.execute(
+            update(Content)
+            .where(Content.structure_id == structure_id, Content.structure_id.in_(_owned_structure_ids(user_id)))
+            .values({column: column + 1})
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            # Content rows are created with their structures, so nothing matching means the
+            # structure does not exist or is not the caller's.
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Structure not found")
+        row = _load_counters(db, structure_id, user_id)
+        db.commit()
+        likes, dislikes = row.likes_count, row.dislikes_count
+    return {"structure_id": structure_id, "likes_count": likes, "dislikes_count": dislikes}
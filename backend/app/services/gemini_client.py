@@ -0,0 +1,263 @@
+import logging
+import random
+import threading
+import time
+from typing import Iterator, Optional
+
+import google.generativeai as genai
+from fastapi import HTTPException, status
+from google.api_core import exceptions as google_exceptions
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+TRANSIENT_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text; good enough for quota pacing.
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute`` tokens per minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for ``amount`` tokens; requests larger than the bucket wait for a full one."""
+        amount = min(amount, self.capacity)
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return True
+                wait = (amount - self._tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def debit(self, amount: float) -> None:
+        """Charge usage discovered after the fact; the balance may go negative."""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures and half-opens after ``reset_seconds``.
+
+    Half-open admits a single probe; everyone else is rejected until it records a result.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        # When the half-open probe was admitted; None while no probe is in flight.
+        self._probe_started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state != "half_open":
+                return state == "closed"
+            now = time.monotonic()
+            # A probe that never reports back (an abandoned stream, say) frees the slot after a window.
+            if self._probe_started_at is not None and now - self._probe_started_at < self.reset_seconds:
+                return False
+            self._probe_started_at = now
+            return True
+
+    def release(self) -> None:
+        """Give back an admission that ended without reaching upstream, such as a throttled call."""
+        with self._lock:
+            self._probe_started_at = None
+
+    def retry_after(self) -> int:
+        with self._lock:
+            if self._opened_at is None:
+                return 0
+            return max(1, int(self.reset_seconds - (time.monotonic() - self._opened_at)))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_started_at = None
+            # A failed probe in half-open state re-opens the circuit for another full window.
+            if self._failures >= self.failure_threshold or self._opened_at is not None:
+                self._opened_at = time.monotonic()
+
+
+class GeminiClientManager:
+    """Process-wide Gemini client with quota pacing, retries and a circuit breaker."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.request_bucket = TokenBucket(settings.gemini_requests_per_minute)
+        self.token_bucket = TokenBucket(settings.gemini_tokens_per_minute)
+        self.breaker = CircuitBreaker(
+            settings.gemini_breaker_failure_threshold,
+            settings.gemini_breaker_reset_seconds,
+        )
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "failures": 0, "rejected": 0, "throttled": 0}
+
+    def _get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    if not settings.gemini_api_key:
+                        raise RuntimeError("GEMINI_API_KEY is not configured")
+                    genai.configure(api_key=settings.gemini_api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def _count(self, name: str) -> None:
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    def _admit(self, prompt: str) -> None:
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Content generation is temporarily unavailable",
+                headers={"Retry-After": str(self.breaker.retry_after())},
+            )
+        timeout = settings.gemini_acquire_timeout_seconds
+        if not (
+            self.request_bucket.acquire(1, timeout)
+            and self.token_bucket.acquire(estimate_tokens(prompt), timeout)
+        ):
+            self.breaker.release()
+            self._count("throttled")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Content generation quota exhausted, try again shortly",
+                headers={"Retry-After": "5"},
+            )
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retries from concurrent requests from synchronising.
+        ceiling = min(settings.gemini_retry_max_delay, settings.gemini_retry_base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _call(self, prompt: str, stream: bool):
+        model = self._get_model()
+        attempt = 0
+        while True:
+            self._admit(prompt)
+            self._count("requests")
+            try:
+                return model.generate_content(prompt, stream=stream)
+            except TRANSIENT_ERRORS as exc:
+                self.breaker.record_failure()
+                if attempt >= settings.gemini_max_retries or not self.breaker.allow():
+                    self._count("failures")
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail="Content generation failed upstream, try again shortly",
+                        headers={"Retry-After": str(max(1, self.breaker.retry_after()))},
+                    ) from exc
+                delay = self._backoff(attempt)
+                logger.warning("Gemini call failed (%s); retrying in %.2fs", exc, delay)
+                self._count("retries")
+                attempt += 1
+                time.sleep(delay)
+            except Exception:
+                # Not an outage (a rejected request, say): free a half-open probe slot for the next caller.
+                self.breaker.release()
+                raise
+
+    def _charge_output(self, response) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        output_tokens = getattr(usage, "candidates_token_count", 0) if usage else 0
+        if output_tokens:
+            self.token_bucket.debit(output_tokens)
+
+    def generate(self, prompt: str) -> str:
+        response = self._call(prompt, stream=False)
+        self.breaker.record_success()
+        self._charge_output(response)
+        return response.text
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        response = self._call(prompt, stream=True)
+        try:
+            for chunk in response:
+                yield chunk.text
+        except TRANSIENT_ERRORS:
+            # Chunks were already forwarded, so a broken stream cannot be retried transparently.
+            self.breaker.record_failure()
+            self._count("failures")
+            raise
+        except (Exception, GeneratorExit):
+            # A blocked chunk or a client that stopped reading says nothing about upstream health.
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        self._charge_output(response)
+
+    def state(self) -> dict:
+        with self._counter_lock:
+            counters = dict(self.counters)
+        return {
+            "model": self.model_name,
+            "circuit": self.breaker.state,
+            "requests_available": round(self.request_bucket.available, 2),
+            "tokens_available": round(self.token_bucket.available, 2),
+            **counters,
+        }
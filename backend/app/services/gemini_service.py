@@ -1,18 +1,97 @@
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from typing import Callable, Iterator, Optional, Sequence
 import re
-
-import google.generativeai as genai
+import time
 
 from app.config import get_settings
+from app.services.cache_service import PromptCache, prompt_cache
+from app.services.llm_provider import get_provider
+from app.utils import tracing
+from app.utils.metrics import REGISTRY, SIZE_BUCKETS
 
 settings = get_settings()
 
+llm_call_duration = REGISTRY.histogram(
+    "llm_call_duration_seconds",
+    "Latency of LLM provider calls (cache misses only) by operation, model and outcome.",
+    ("operation", "model", "outcome"),
+)
+llm_prompt_chars = REGISTRY.histogram(
+    "llm_prompt_chars",
+    "Size in characters of prompts sent to the LLM provider.",
+    ("operation",),
+    buckets=SIZE_BUCKETS,
+)
+llm_response_chars = REGISTRY.histogram(
+    "llm_response_chars",
+    "Size in characters of LLM provider responses.",
+    ("operation",),
+    buckets=SIZE_BUCKETS,
+)
+llm_errors_total = REGISTRY.counter(
+    "llm_errors_total",
+    "Failed LLM provider calls by operation and exception type.",
+    ("operation", "model", "error"),
+)
+llm_cache_lookups_total = REGISTRY.counter(
+    "llm_cache_lookups_total",
+    "Prompt cache lookups by operation and result.",
+    ("operation", "result"),
+)
+
+
+def _record_call(operation: str, model: str, prompt: str, started: float, text: Optional[str], error=None) -> None:
+    outcome = "error" if error is not None else "ok"
+    llm_call_duration.observe(time.perf_counter() - started, operation=operation, model=model, outcome=outcome)
+    llm_prompt_chars.observe(len(prompt), operation=operation)
+    if error is not None:
+        llm_errors_total.inc(operation=operation, model=model, error=type(error).__name__)
+    else:
+        llm_response_chars.observe(len(text or ""), operation=operation)
+
+
+def _timed_call(operation: str, model: str, prompt: str, call: Callable[[], str]) -> str:
+    started = time.perf_counter()
+    with tracing.span(f"llm.{operation}", model=model, prompt_chars=len(prompt)) as span:
+        try:
+            text = call()
+        except Exception as exc:
+            _record_call(operation, model, prompt, started, None, exc)
+            raise
+        if span is not None:
+            span.set(response_chars=len(text))
+    _record_call(operation, model, prompt, started, text)
+    return text
+
+
+def _cached(operation: str, use_cache: bool, key: str) -> Optional[str]:
+    if not use_cache:
+        return None
+    with tracing.span("llm.cache_lookup", operation=operation) as span:
+        cached = prompt_cache.get(key)
+        if span is not None:
+            span.set(hit=cached is not None)
+    llm_cache_lookups_total.inc(operation=operation, result="miss" if cached is None else "hit")
+    return cached
+
 
-def _client():
-    if not settings.gemini_api_key:
-        raise RuntimeError("GEMINI_API_KEY is not configured")
-    genai.configure(api_key=settings.gemini_api_key)
-    return genai.GenerativeModel("gemini-2.5-flash")
+def _complete(
+    prompt: str,
+    use_cache: bool = True,
+    produce: Optional[Callable[[], str]] = None,
+    operation: str = "generate",
+) -> str:
+    provider = get_provider()
+    use_cache = use_cache and settings.prompt_cache_enabled
+    key = PromptCache.make_key(provider.model_name, prompt)
+    cached = _cached(operation, use_cache, key)
+    if cached is not None:
+        return cached
+    text = _timed_call(operation, provider.model_name, prompt, produce or (lambda: provider.generate(prompt)))
+    if use_cache:
+        prompt_cache.put(key, provider.model_name, text)
+    return text
 
 
 def _contains_explicit_format_instruction(text: str) -> bool:
@@ -49,14 +128,12 @@ def _extract_lines_from_text(text: str) -> Optional[int]:
     return None
 
 
-def generate_content(
+def _compile_generation_prompt(
     prompt: str,
     context: Optional[str] = None,
-    document_type: str = "docx",
     side_heading: Optional[str] = None,
     lines_count: Optional[int] = None,
 ) -> str:
-    client = _client()
     # Determine effective number of lines: priority -> explicit param -> prompt/context -> default
     effective_lines = None
     if lines_count and lines_count > 0:
@@ -77,23 +154,112 @@ def generate_content(
     )
     if context:
         compiled_prompt += f"\nContext:\n{context}"
+    return compiled_prompt
 
-    response = client.generate_content(compiled_prompt)
-    return response.text
 
+def generate_content(
+    prompt: str,
+    context: Optional[str] = None,
+    document_type: str = "docx",
+    side_heading: Optional[str] = None,
+    lines_count: Optional[int] = None,
+    use_cache: bool = True,
+) -> str:
+    compiled_prompt = _compile_generation_prompt(prompt, context, side_heading, lines_count)
+    return _complete(compiled_prompt, use_cache=use_cache)
+
+
+def stream_content(
+    prompt: str,
+    context: Optional[str] = None,
+    document_type: str = "docx",
+    side_heading: Optional[str] = None,
+    lines_count: Optional[int] = None,
+    use_cache: bool = True,
+) -> Iterator[str]:
+    """Streaming counterpart of ``generate_content`` yielding text chunks as the model produces them."""
+    compiled_prompt = _compile_generation_prompt(prompt, context, side_heading, lines_count)
+    provider = get_provider()
+    use_cache = use_cache and settings.prompt_cache_enabled
+    key = PromptCache.make_key(provider.model_name, compiled_prompt)
+    cached = _cached("stream", use_cache, key)
+    if cached is not None:
+        yield cached
+        return
 
-def suggest_outline(document_type: str, main_topic: str, desired_sections: int) -> list[dict]:
-    client = _client()
+    parts = []
+    started = time.perf_counter()
+    # Not entered as the current span: a generator's context is not restored between yields.
+    span = tracing.start_span("llm.stream", model=provider.model_name, prompt_chars=len(compiled_prompt))
+    try:
+        for text in provider.stream(compiled_prompt):
+            if text:
+                parts.append(text)
+                yield text
+    except GeneratorExit:
+        # Client went away mid-stream; the partial call is neither a success nor an upstream error.
+        raise
+    except Exception as exc:
+        _record_call("stream", provider.model_name, compiled_prompt, started, None, exc)
+        if span is not None:
+            span.record_error(exc)
+        raise
+    finally:
+        if span is not None:
+            span.set(response_chars=sum(len(part) for part in parts))
+            span.end()
+    _record_call("stream", provider.model_name, compiled_prompt, started, "".join(parts))
+    if use_cache:
+        prompt_cache.put(key, provider.model_name, "".join(parts))
+
+
+def generate_content_batch(
+    jobs: Sequence[dict],
+    max_concurrency: Optional[int] = None,
+) -> list[str | Exception]:
+    """Run ``generate_content`` for each job (a dict of its keyword arguments) concurrently.
+
+    Results come back in job order; a failed job yields its exception instead of text.
+    ``max_concurrency`` can only lower ``GENERATION_MAX_CONCURRENCY``, never raise it.
+    """
+    if not jobs:
+        return []
+    cap = settings.generation_max_concurrency
+    workers = max(1, min(max_concurrency or cap, cap, len(jobs)))
+
+    def _run(job: dict) -> str | Exception:
+        try:
+            return generate_content(**job)
+        except Exception as exc:
+            return exc
+
+    # Each job runs in its own copy of the caller's context so trace spans nest under the request.
+    contexts = [contextvars.copy_context() for _ in jobs]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini") as pool:
+        return list(pool.map(lambda ctx, job: ctx.run(_run, job), contexts, jobs))
+
+
+def suggest_outline(
+    document_type: str,
+    main_topic: str,
+    desired_sections: int,
+    use_cache: bool = True,
+) -> list[dict]:
     prompt = (
         f"You are planning a {document_type} deliverable about '{main_topic}'. "
         f"Return exactly {desired_sections} JSON objects with 'title' and 'element_type' keys. "
         "Use 'section' for Word docs and 'slide' for decks."
     )
-    response = client.generate_content(prompt)
+    text = _complete(
+        prompt,
+        use_cache=use_cache,
+        produce=lambda: get_provider().outline(prompt, document_type, main_topic, desired_sections),
+        operation="outline",
+    )
     try:
         import json
 
-        parsed = json.loads(response.text)
+        parsed = json.loads(text)
         if isinstance(parsed, list):
             return parsed
     except Exception:
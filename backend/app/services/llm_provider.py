@@ -0,0 +1,158 @@
+import abc
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Iterator
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+
+settings = get_settings()
+
+GEMINI_MODEL_NAME = "gemini-2.5-flash"
+
+
+class LLMProvider(abc.ABC):
+    """Interface every text-generation backend implements."""
+
+    model_name: str
+
+    @abc.abstractmethod
+    def generate(self, prompt: str) -> str:
+        ...
+
+    @abc.abstractmethod
+    def stream(self, prompt: str) -> Iterator[str]:
+        ...
+
+    def outline(self, prompt: str, document_type: str, main_topic: str, desired_sections: int) -> str:
+        """Return the raw model answer for an outline prompt (expected to be a JSON list)."""
+        return self.generate(prompt)
+
+    def state(self) -> dict:
+        return {"provider": type(self).__name__, "model": self.model_name}
+
+
+class GeminiProvider(LLMProvider):
+    def __init__(self, model_name: str = GEMINI_MODEL_NAME):
+        # Imported here so deployments running another provider never load the Google SDK.
+        from app.services.gemini_client import GeminiClientManager
+
+        self.model_name = model_name
+        self.manager = GeminiClientManager(model_name)
+
+    def generate(self, prompt: str) -> str:
+        return self.manager.generate(prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        return self.manager.stream(prompt)
+
+    def state(self) -> dict:
+        return {"provider": "gemini", **self.manager.state()}
+
+
+class FakeProvider(LLMProvider):
+    """Deterministic offline provider for load tests.
+
+    The text depends only on the prompt, while latency and failures are drawn from a
+    seeded RNG so runs are reproducible.
+    """
+
+    model_name = "fake"
+
+    _LINES_PATTERN = re.compile(r"Produce exactly (\d+) concise lines")
+
+    def __init__(self, latency_ms: float, latency_sigma: float, error_rate: float, seed: int):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "errors": 0}
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._lock:
+            self.counters["requests"] += 1
+            # Log-normal around the median gives the long right tail real model latencies have.
+            factor = self._random.lognormvariate(0, self.latency_sigma) if self.latency_sigma > 0 else 1.0
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.counters["errors"] += 1
+        return self.latency_ms * factor / 1000.0, failed
+
+    @staticmethod
+    def _fail() -> None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Fake provider injected failure",
+        )
+
+    def _text(self, prompt: str) -> str:
+        match = self._LINES_PATTERN.search(prompt)
+        count = int(match.group(1)) if match else 4
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return "\n".join(f"Generated line {idx + 1} ({digest[idx * 8:idx * 8 + 8]})." for idx in range(count))
+
+    def generate(self, prompt: str) -> str:
+        delay, failed = self._draw()
+        time.sleep(delay)
+        if failed:
+            self._fail()
+        return self._text(prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        delay, failed = self._draw()
+        lines = self._text(prompt).split("\n")
+        # Spend a fifth of the latency before the first chunk, the rest spread across the others.
+        time.sleep(delay * 0.2)
+        if failed:
+            self._fail()
+        per_line = delay * 0.8 / len(lines)
+        for idx, line in enumerate(lines):
+            if idx:
+                time.sleep(per_line)
+            yield line if idx == len(lines) - 1 else line + "\n"
+
+    def outline(self, prompt: str, document_type: str, main_topic: str, desired_sections: int) -> str:
+        delay, failed = self._draw()
+        time.sleep(delay)
+        if failed:
+            self._fail()
+        element_type = "section" if document_type == "docx" else "slide"
+        return json.dumps(
+            [
+                {"title": f"{main_topic} - part {idx + 1}", "element_type": element_type}
+                for idx in range(desired_sections)
+            ]
+        )
+
+    def state(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "provider": "fake",
+            "model": self.model_name,
+            "latency_ms": self.latency_ms,
+            "latency_sigma": self.latency_sigma,
+            "error_rate": self.error_rate,
+            **counters,
+        }
+
+
+@lru_cache
+def get_provider() -> LLMProvider:
+    if settings.llm_provider == "fake":
+        return FakeProvider(
+            latency_ms=settings.fake_llm_latency_ms,
+            latency_sigma=settings.fake_llm_latency_sigma,
+            error_rate=settings.fake_llm_error_rate,
+            seed=settings.fake_llm_seed,
+        )
+    if settings.llm_provider == "gemini":
+        return GeminiProvider()
+    raise RuntimeError(f"Unknown LLM_PROVIDER '{settings.llm_provider}'")
@@ -0,0 +1,66 @@
+"""
+Compact text deltas for refinement history.
+
+A delta is a JSON list of operations applied to the whitespace-preserving tokens of
+the old text: a positive int copies that many tokens, a negative int skips them and a
+string is inserted verbatim.
+"""
+
+import json
+import re
+from difflib import SequenceMatcher
+from typing import Optional
+
+_TOKEN = re.compile(r"\s+|\S+")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text)
+
+
+def make_delta(old: str, new: str) -> str:
+    old_tokens, new_tokens = _tokens(old), _tokens(new)
+    ops: list = []
+    matcher = SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append("".join(new_tokens[j1:j2]))
+    return json.dumps(ops, separators=(",", ":"), ensure_ascii=False)
+
+
+def apply_delta(old: str, delta: str) -> str:
+    old_tokens = _tokens(old)
+    position = 0
+    parts = []
+    for op in json.loads(delta):
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.extend(old_tokens[position:position + op])
+            position += op
+        else:
+            position -= op
+    return "".join(parts)
+
+
+def encode_revision(
+    previous: Optional[str],
+    original: str,
+    revised: str,
+    since_snapshot: int,
+    snapshot_interval: int,
+) -> tuple[Optional[str], str]:
+    """Return ``(base_content, delta)`` for a revision that turned ``original`` into ``revised``.
+
+    ``previous`` is the chain's latest version. A snapshot of ``original`` is stored when the
+    chain is empty, broken (the text changed outside refinement) or ``snapshot_interval`` long,
+    which bounds how many deltas a read has to replay.
+    """
+    original = original or ""
+    snapshot = previous is None or previous != original or since_snapshot >= snapshot_interval
+    return (original if snapshot else None), make_delta(original, revised)
@@ -0,0 +1,159 @@
+import bisect
+import threading
+from typing import Callable, Iterable, Sequence
+
+# Seconds; covers sub-millisecond pool checkouts up to multi-second upstream calls.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (100, 500, 1_000, 2_000, 5_000, 10_000, 50_000, 200_000)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+class Histogram:
+    """Thread-safe cumulative histogram with fixed upper bounds, Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative.append(("+Inf" if bound == float("inf") else bound, running))
+        return {"buckets": cumulative, "count": running, "sum": total}
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Family:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labels: dict, factory):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, factory())
+        return child
+
+    def _items(self):
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class _CounterValue:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        self._child(labels, _CounterValue).inc(amount)
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        for labels, child in self._items():
+            yield f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"
+
+
+class LabeledHistogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.bucket_bounds = buckets
+
+    def observe(self, value: float, **labels) -> None:
+        self._child(labels, lambda: Histogram(self.bucket_bounds)).observe(value)
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        for labels, child in self._items():
+            yield from render_histogram(self.name, child.snapshot(), labels)
+
+
+def render_histogram(name: str, snapshot: dict, labels: dict) -> Iterable[str]:
+    for bound, count in snapshot["buckets"]:
+        yield f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}"
+    yield f"{name}_sum{_format_labels(labels)} {_format_value(snapshot['sum'])}"
+    yield f"{name}_count{_format_labels(labels)} {snapshot['count']}"
+
+
+class Registry:
+    def __init__(self):
+        self._families: list[_Family] = []
+        self._collectors: list[Callable[[], Iterable[str]]] = []
+
+    def register(self, family: _Family) -> _Family:
+        self._families.append(family)
+        return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> LabeledHistogram:
+        return self.register(LabeledHistogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Register a callable producing exposition lines at scrape time (for gauges read from elsewhere)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for family in self._families:
+            lines.extend(family.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
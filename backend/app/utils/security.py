@@ -1,6 +1,28 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.config import get_settings
+
+settings = get_settings()
+
+# Pinning min and max to the configured cost makes any hash created under an older policy
+# "need update", so it is transparently re-hashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = settings.password_hash_workers
+_pool_lock = threading.Lock()
 
 
 def hash_password(password: str) -> str:
@@ -11,3 +33,50 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Return whether the password matches and, if the hash is outdated, its replacement."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if _pool_workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers do not inherit the parent's threads, sockets or DB connections.
+            _pool = ProcessPoolExecutor(
+                max_workers=_pool_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def configure_hash_pool(workers: int) -> None:
+    """Resize the hashing pool; ``0`` hashes on the default thread pool instead."""
+    global _pool_workers
+    shutdown_hash_pool()
+    _pool_workers = workers
+
+
+def shutdown_hash_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+async def _run_in_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_pool(), func, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str,
+) -> tuple[bool, Optional[str]]:
+    return await _run_in_pool(verify_and_update_password, plain_password, hashed_password)
@@ -0,0 +1,265 @@
+import abc
+import importlib
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, exc: BaseException) -> None:
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            _exporter.export(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+        }
+
+
+class _Trace:
+    __slots__ = ("trace_id", "sampled")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+
+
+_trace: ContextVar[Optional[_Trace]] = ContextVar("trace", default=None)
+_parent: ContextVar[Optional[Span]] = ContextVar("trace_parent", default=None)
+
+
+def new_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+@contextmanager
+def trace(trace_id: Optional[str] = None) -> Iterator[str]:
+    """Open a trace for the current context (one per request); spans outside a trace are dropped."""
+    trace_state = _Trace(
+        trace_id or new_trace_id(),
+        sampled=_exporter.enabled and random.random() < settings.tracing_sample_ratio,
+    )
+    token = _trace.set(trace_state)
+    try:
+        yield trace_state.trace_id
+    finally:
+        _trace.reset(token)
+
+
+def current_trace_id() -> Optional[str]:
+    state = _trace.get()
+    return state.trace_id if state else None
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """Start a span under the current one without making it current; call ``end()`` yourself."""
+    state = _trace.get()
+    if state is None or not state.sampled:
+        return None
+    parent = _parent.get()
+    return Span(name, state.trace_id, parent.span_id if parent else None, attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    current = start_span(name, **attributes)
+    if current is None:
+        yield None
+        return
+    token = _parent.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        if not isinstance(exc, GeneratorExit):
+            current.record_error(exc)
+        raise
+    finally:
+        _parent.reset(token)
+        current.end()
+
+
+class SpanExporter(abc.ABC):
+    enabled = True
+
+    @abc.abstractmethod
+    def export(self, span: Span) -> None:
+        ...
+
+    def shutdown(self) -> None:
+        pass
+
+
+class NoopExporter(SpanExporter):
+    enabled = False
+
+    def export(self, span: Span) -> None:
+        pass
+
+
+class JsonLinesExporter(SpanExporter):
+    """Writes one JSON object per finished span to a file, or to stdout when no path is given."""
+
+    def __init__(self, path: Optional[str] = None):
+        self._stream = open(path, "a", encoding="utf-8", buffering=1) if path else sys.stdout
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._stream.write(line + "\n")
+
+    def shutdown(self) -> None:
+        if self._stream is not sys.stdout:
+            self._stream.close()
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpExporter(SpanExporter):
+    """Batches spans and POSTs them as OTLP/HTTP JSON (``/v1/traces``) from a background thread."""
+
+    def __init__(self, endpoint: str, service_name: str, batch_size: int = 256, interval: float = 2.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: queue.Queue = queue.Queue(maxsize=10_000)
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._worker.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            pass  # Shedding spans beats blocking a request on a slow collector.
+
+    def _encode(self, spans: list[Span]) -> bytes:
+        encoded = [
+            {
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id or "",
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+            }
+            for s in spans
+        ]
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                    "scopeSpans": [{"scope": {"name": "app"}, "spans": encoded}],
+                }
+            ]
+        }
+        return json.dumps(body).encode()
+
+    def _send(self, spans: list[Span]) -> None:
+        request = urllib.request.Request(
+            self.url, data=self._encode(spans), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except OSError:
+            pass  # Collector unavailable; tracing must never fail the app.
+
+    def _drain(self) -> list[Span]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            while batch := self._drain():
+                self._send(batch)
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self._worker.join(timeout=5)
+        while batch := self._drain():
+            self._send(batch)
+
+
+def _build_exporter(name: str) -> SpanExporter:
+    if name in ("", "none"):
+        return NoopExporter()
+    if name == "stdout":
+        return JsonLinesExporter()
+    if name == "jsonl":
+        return JsonLinesExporter(settings.tracing_jsonl_path)
+    if name == "otlp":
+        return OtlpHttpExporter(settings.tracing_otlp_endpoint, settings.tracing_service_name)
+    # Anything else is a "package.module:ClassName" for a custom SpanExporter.
+    module_name, _, attr = name.partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+_exporter: SpanExporter = _build_exporter(settings.tracing_exporter)
+
+
+def set_exporter(exporter: SpanExporter) -> SpanExporter:
+    """Swap the active exporter, returning the previous one (which is not shut down)."""
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    return previous
+
+
+def shutdown_tracing() -> None:
+    _exporter.shutdown()
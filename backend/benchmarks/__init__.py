@@ -0,0 +1,3 @@
+"""
+Offline benchmarks and performance checks. Run from ``backend/`` as ``python -m benchmarks.<name>``.
+"""
@@ -0,0 +1,47 @@
+"""
+Shared setup for benchmarks: a throwaway SQLite database and a SQL statement counter.
+
+Import this module before anything from ``app`` so the engine binds to the temporary database.
+"""
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+_db_dir = tempfile.mkdtemp(prefix="benchmarks-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.database.connection import Base, engine  # noqa: E402
+
+
+def create_schema() -> None:
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+    Base.metadata.create_all(bind=engine)
+
+
+@contextmanager
+def count_queries():
+    counter = {"count": 0}
+
+    def _before_execute(*_args):
+        counter["count"] += 1
+
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_execute)
+
+
+@contextmanager
+def timer():
+    result = {"seconds": 0.0}
+    started = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - started
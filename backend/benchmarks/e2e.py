@@ -0,0 +1,272 @@
+"""
+End-to-end API benchmark: latency percentiles and requests/sec for the main user flows.
+
+Boots ``app.main.app`` in-process over httpx's ASGI transport against a throwaway SQLite
+database, with the fake LLM provider standing in for Gemini, so it runs offline and gives
+the same numbers on the same machine. Every request goes through the full middleware
+stack. Project-level flows run at several project sizes (sections per project).
+
+Results are written as JSON with ``--output`` and can be compared with an earlier run
+with ``--compare``, which fails when a scenario's p50 grew by more than the tolerance.
+Settings such as ``BCRYPT_ROUNDS`` or ``FAKE_LLM_LATENCY_MS`` can be overridden through
+the environment.
+
+    python -m benchmarks.e2e [--requests N] [--concurrency N] [--sizes 5,20,100]
+                             [--output results.json] [--compare baseline.json] [--tolerance 0.25]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# Deterministic, offline defaults; anything already in the environment wins. Set before
+# anything from ``app`` is imported, because settings are read once.
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "0")
+os.environ.setdefault("FAKE_LLM_LATENCY_SIGMA", "0")
+os.environ.setdefault("FAKE_LLM_ERROR_RATE", "0")
+os.environ.setdefault("TRACING_EXPORTER", "none")
+# Measure inline rendering at every size rather than the background-job hand-off.
+os.environ.setdefault("EXPORT_SYNC_MAX_SECTIONS", "100000")
+
+from benchmarks.common import timer  # noqa: E402
+
+import httpx  # noqa: E402
+
+from app.config import get_settings  # noqa: E402
+from app.database.migrations import run_migrations  # noqa: E402
+from app.main import app  # noqa: E402
+
+PASSWORD = "benchmark-password"
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+class Runner:
+    def __init__(self, client: httpx.AsyncClient, requests: int, concurrency: int):
+        self.client = client
+        self.requests = requests
+        self.concurrency = concurrency
+        self.results: list[dict] = []
+
+    async def measure(self, scenario: str, size, call) -> list[httpx.Response]:
+        """Run ``call(index)`` ``requests`` times, at most ``concurrency`` at once."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        latencies: list[float] = []
+        responses: list[httpx.Response] = [None] * self.requests
+        errors = 0
+
+        async def _one(index: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await call(index)
+                latencies.append((time.perf_counter() - started) * 1000)
+            responses[index] = response
+            if response.status_code >= 400:
+                errors += 1
+
+        with timer() as elapsed:
+            await asyncio.gather(*(_one(index) for index in range(self.requests)))
+        latencies.sort()
+        result = {
+            "scenario": scenario,
+            "size": size,
+            "requests": self.requests,
+            "errors": errors,
+            "rps": self.requests / elapsed["seconds"],
+            "mean_ms": sum(latencies) / len(latencies),
+            **{f"p{pct}_ms": percentile(latencies, pct) for pct in PERCENTILES},
+            "max_ms": latencies[-1],
+        }
+        self.results.append(result)
+        print(
+            f"{scenario:<15} {size if size is not None else '-':>5} {result['rps']:>9.1f} "
+            f"{result['p50_ms']:>9.2f} {result['p90_ms']:>9.2f} {result['p99_ms']:>9.2f} {errors:>6}"
+        )
+        if errors:
+            first = next(response for response in responses if response.status_code >= 400)
+            print(f"  first error: {first.status_code} {first.text[:200]}")
+        return responses
+
+
+async def auth_flows(runner: Runner) -> None:
+    client = runner.client
+    await runner.measure(
+        "register",
+        None,
+        lambda index: client.post("/auth/register", json={"email": f"bench{index}@example.com", "password": PASSWORD}),
+    )
+    await runner.measure(
+        "login",
+        None,
+        lambda index: client.post("/auth/login", json={"email": f"bench{index}@example.com", "password": PASSWORD}),
+    )
+
+
+async def project_flows(runner: Runner, size: int) -> None:
+    client = runner.client
+    # A fresh user per size, so listing cost reflects this size only.
+    email = f"size{size}@example.com"
+    await client.post("/auth/register", json={"email": email, "password": PASSWORD})
+    token = (await client.post("/auth/login", json={"email": email, "password": PASSWORD})).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def _payload(index: int, title: str = "Section") -> dict:
+        return {
+            "project_name": f"Project {index}",
+            "document_type": "docx" if index % 2 == 0 else "pptx",
+            "main_topic": "Quarterly business review",
+            "structures": [
+                {"element_type": "section" if index % 2 == 0 else "slide", "title": f"{title} {idx}", "order_index": idx}
+                for idx in range(size)
+            ],
+        }
+
+    created = await runner.measure(
+        "project_create", size, lambda index: client.post("/projects/", json=_payload(index), headers=headers)
+    )
+    projects = [response.json() for response in created]
+    sections = [structure["id"] for project in projects for structure in project["structures"]]
+
+    def _project(index: int) -> dict:
+        return projects[index % len(projects)]
+
+    def _section(index: int) -> int:
+        return sections[index % len(sections)]
+
+    await runner.measure("project_list", size, lambda index: client.get("/projects/", headers=headers))
+    await runner.measure(
+        "project_get", size, lambda index: client.get(f"/projects/{_project(index)['id']}", headers=headers)
+    )
+
+    def _update(index: int):
+        project = _project(index)
+        payload = {
+            "project_name": f"{project['project_name']} (revised)",
+            "document_type": project["document_type"],
+            "main_topic": project["main_topic"],
+            "structures": [
+                {**{key: structure[key] for key in ("id", "element_type", "order_index")}, "title": f"Revised {index}"}
+                for structure in project["structures"]
+            ],
+        }
+        return client.put(f"/projects/{project['id']}", json=payload, headers=headers)
+
+    await runner.measure("project_update", size, _update)
+
+    # Cache bypassed so every call reaches the provider and writes content.
+    await runner.measure(
+        "generate",
+        size,
+        lambda index: client.post(
+            f"/generate/{_section(index)}", json={"prompt": f"Draft {index}", "use_cache": False}, headers=headers
+        ),
+    )
+    await runner.measure(
+        "refine",
+        size,
+        lambda index: client.post(
+            f"/generate/{_section(index)}/refine", json={"prompt": f"Tighten {index}", "use_cache": False}, headers=headers
+        ),
+    )
+    await runner.measure(
+        "feedback",
+        size,
+        lambda index: client.post(
+            f"/generate/{_section(index)}/feedback", json={"positive": index % 3 != 0}, headers=headers
+        ),
+    )
+    await runner.measure("export", size, lambda index: client.get(f"/export/{_project(index)['id']}", headers=headers))
+
+
+async def run(args) -> list[dict]:
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        runner = Runner(client, args.requests, args.concurrency)
+        print(f"{'scenario':<15} {'size':>5} {'req/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'errors':>6}")
+        await auth_flows(runner)
+        for size in args.sizes:
+            await project_flows(runner, size)
+    return runner.results
+
+
+def environment() -> dict:
+    settings = get_settings()
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "database": settings.database_url.split(":", 1)[0],
+        "bcrypt_rounds": settings.bcrypt_rounds,
+        "fake_llm_latency_ms": settings.fake_llm_latency_ms,
+    }
+
+
+def compare(results: list[dict], baseline_path: str, tolerance: float) -> list[str]:
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = {(row["scenario"], row["size"]): row for row in json.load(handle)["results"]}
+    regressions = []
+    print(f"\ncompared with {baseline_path} (p50, tolerance {tolerance:.0%})")
+    for row in results:
+        before = baseline.get((row["scenario"], row["size"]))
+        if before is None or not before["p50_ms"]:
+            continue
+        change = row["p50_ms"] / before["p50_ms"] - 1
+        flag = "REGRESSED" if change > tolerance else ""
+        print(f"{row['scenario']:<15} {row['size'] if row['size'] is not None else '-':>5} {change:>+8.1%} {flag}")
+        if flag:
+            regressions.append(f"{row['scenario']}@{row['size']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario and size")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[5, 20, 100])
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 growth before failing, as a fraction")
+    args = parser.parse_args()
+
+    run_migrations()
+    results = asyncio.run(run(args))
+    report = {"environment": environment(), "parameters": vars(args), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\nwrote {args.output}")
+
+    problems = [f"{row['scenario']}@{row['size']}: {row['errors']} errors" for row in results if row["errors"]]
+    if args.compare:
+        problems += [f"{name}: p50 regressed" for name in compare(results, args.compare, args.tolerance)]
+    if problems:
+        sys.exit("FAIL: " + "; ".join(problems))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measures per-export CPU time for DOCX and PPTX rendering at several project sizes.
+
+Compares the rendering ``document_service`` used to do (parse the template package on
+every export, re-sort the structures, copy the finished buffer) with the current path
+(clone a cached template, render in order, return a view of the buffer). Uses in-memory
+model objects, so no database is involved.
+
+    python -m benchmarks.export_render [--repeat N]
+"""
+
+import argparse
+import io
+import time
+
+from app import models
+from app.services import document_service
+
+SIZES = (10, 50, 200)
+
+
+def _project(sections: int, document_type: str) -> models.Project:
+    project = models.Project(id=1, project_name="Benchmark", document_type=document_type, main_topic="Benchmarks")
+    body = "\n".join(f"Line {line} of generated content for this section." for line in range(6))
+    project.structures = [
+        models.DocumentStructure(
+            title=f"Section {idx}",
+            order_index=idx,
+            element_type="section" if document_type == "docx" else "slide",
+            content=models.Content(generated_content=body),
+        )
+        for idx in range(sections)
+    ]
+    return project
+
+
+def fresh_docx(project: models.Project, structures) -> bytes:
+    """The rendering ``export_docx`` did before templates were cached."""
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading(project.project_name, level=1)
+    for structure in sorted(structures, key=lambda s: s.order_index):
+        doc.add_heading(structure.title, level=2)
+        doc.add_paragraph(structure.content.generated_content if structure.content else "Content pending.")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer.read()
+
+
+def fresh_pptx(project: models.Project, structures) -> bytes:
+    """The rendering ``export_pptx`` did before templates were cached."""
+    from pptx import Presentation
+
+    prs = Presentation()
+    for structure in sorted(structures, key=lambda s: s.order_index):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = structure.title
+        slide.shapes.placeholders[1].text = structure.content.generated_content if structure.content else "Content pending."
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    buffer.seek(0)
+    return buffer.read()
+
+
+def cpu_ms(render, project: models.Project, repeat: int) -> float:
+    started = time.process_time()
+    for _ in range(repeat):
+        render(project, project.structures)
+    return (time.process_time() - started) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10, help="exports per format, size and strategy")
+    args = parser.parse_args()
+
+    document_service.warm_up()
+    print(f"{'format':>6} {'sections':>8} {'fresh ms':>9} {'cached ms':>10} {'saved':>6}")
+    for document_type, fresh, cached in (
+        ("docx", fresh_docx, document_service.export_docx),
+        ("pptx", fresh_pptx, document_service.export_pptx),
+    ):
+        for size in SIZES:
+            project = _project(size, document_type)
+            before = cpu_ms(fresh, project, args.repeat)
+            after = cpu_ms(cached, project, args.repeat)
+            print(f"{document_type:>6} {size:>8} {before:>9.1f} {after:>10.1f} {1 - after / before:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
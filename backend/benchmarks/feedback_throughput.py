@@ -0,0 +1,86 @@
+"""
+Measures feedback votes per second with inline atomic increments and with write-behind.
+
+Many threads vote on the same few sections at once, which is the worst case for row-lock
+contention. After each run the stored counters are checked against the number of votes
+cast, so a lost update fails the benchmark.
+
+    python -m benchmarks.feedback_throughput [--votes N] [--threads N] [--sections N]
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import count_queries, create_schema, timer
+
+from app import models
+from app.database.connection import SessionLocal
+from app.services import feedback_service
+
+
+def seed(sections: int) -> tuple[int, list[int]]:
+    with SessionLocal() as db:
+        user = models.User(email="feedback@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        project = models.Project(user_id=user.id, project_name="votes", document_type="docx", main_topic="Benchmarks")
+        project.structures = [
+            models.DocumentStructure(
+                element_type="section",
+                title=f"Section {idx}",
+                order_index=idx,
+                content=models.Content(generated_content="text"),
+            )
+            for idx in range(sections)
+        ]
+        db.add(project)
+        db.commit()
+        return user.id, [structure.id for structure in project.structures]
+
+
+def stored_votes(structure_ids: list[int]) -> int:
+    with SessionLocal() as db:
+        rows = db.query(models.Content).filter(models.Content.structure_id.in_(structure_ids)).all()
+        return sum(row.likes_count + row.dislikes_count for row in rows)
+
+
+def run(user_id: int, structure_ids: list[int], votes: int, threads: int) -> float:
+    def _vote(index: int) -> None:
+        with SessionLocal() as db:
+            feedback_service.record_feedback(db, structure_ids[index % len(structure_ids)], user_id, index % 3 != 0)
+
+    with timer() as elapsed, ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(_vote, range(votes)))
+    return elapsed["seconds"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--votes", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--sections", type=int, default=4)
+    args = parser.parse_args()
+
+    create_schema()
+    user_id, structure_ids = seed(args.sections)
+    expected = 0
+    print(f"{'mode':<13} {'votes/sec':>10} {'queries/vote':>13}")
+    for mode, buffer in (
+        ("atomic", None),
+        ("write-behind", feedback_service.FeedbackBuffer(interval_seconds=0.5)),
+    ):
+        feedback_service.feedback_buffer = buffer
+        with count_queries() as queries:
+            seconds = run(user_id, structure_ids, args.votes, args.threads)
+            if buffer is not None:
+                buffer.shutdown()
+        expected += args.votes
+        stored = stored_votes(structure_ids)
+        if stored != expected:
+            raise SystemExit(f"{mode}: lost updates, stored {stored} of {expected} votes")
+        print(f"{mode:<13} {args.votes / seconds:>10.0f} {queries['count'] / args.votes:>13.2f}")
+    print("OK: no lost updates")
+
+
+if __name__ == "__main__":
+    main()
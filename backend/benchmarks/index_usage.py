@@ -0,0 +1,119 @@
+"""
+Checks that the hot listing and lookup queries are served by the hot-path indexes.
+
+Builds the schema through the Alembic migrations, seeds a few projects, captures the SQL
+each service call actually emits and runs EXPLAIN (``EXPLAIN QUERY PLAN`` on SQLite) on
+it. Exits non-zero if an expected index does not appear in the plan. On MySQL, tiny
+tables can make the optimiser prefer a scan, so seed realistic volumes first.
+
+    python -m benchmarks.index_usage [--verbose]
+"""
+
+import argparse
+
+from benchmarks.common import count_queries  # noqa: F401  (binds the throwaway database first)
+
+from sqlalchemy import event
+
+from app import models
+from app.database.connection import SessionLocal, engine
+from app.database.migrations import run_migrations
+from app.services import database_service
+
+CHECKS = (
+    (
+        "project summaries",
+        lambda db, ids: database_service.list_project_summaries(db, ids["user"], limit=10),
+        ("ix_projects_user_id_updated_at",),
+    ),
+    (
+        "project list",
+        lambda db, ids: database_service.list_projects_for_user(db, ids["user"]),
+        ("ix_projects_user_id_updated_at", "ix_document_structure_project_id_order_index", "uq_content_blocks_structure_id"),
+    ),
+    (
+        "structure lookup",
+        lambda db, ids: database_service.get_structure_for_user(db, ids["structure"], ids["user"], include_history=True),
+        ("uq_content_blocks_structure_id", "ix_refinement_history_content_id_created_at"),
+    ),
+    (
+        "history page",
+        lambda db, ids: database_service.list_history_for_user(db, ids["structure"], ids["user"], limit=5),
+        ("ix_refinement_history_content_id_created_at",),
+    ),
+)
+
+
+def seed() -> dict:
+    with SessionLocal() as db:
+        user = models.User(email="indexes@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        for index in range(3):
+            project = models.Project(user_id=user.id, project_name=f"p{index}", document_type="docx", main_topic="t")
+            project.structures = [
+                models.DocumentStructure(
+                    element_type="section",
+                    title=f"Section {position}",
+                    order_index=position,
+                    content=models.Content(generated_content="text"),
+                )
+                for position in range(5)
+            ]
+            db.add(project)
+        db.flush()
+        structure = project.structures[0]
+        for revision in range(8):
+            structure.content.record_refinement(structure.content.generated_content, f"text {revision}", "again")
+            structure.content.generated_content = f"text {revision}"
+        db.commit()
+        return {"user": user.id, "structure": structure.id}
+
+
+def explain(conn, statement: str, parameters) -> list[str]:
+    if engine.dialect.name == "sqlite":
+        return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+    return [f"{row.table}: {row.key}" for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters)]
+
+
+def capture(action) -> list[tuple[str, object]]:
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        with SessionLocal() as db:
+            action(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return statements
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--verbose", action="store_true", help="print every captured statement and its plan")
+    args = parser.parse_args()
+
+    run_migrations()
+    ids = seed()
+    failures = 0
+    with engine.connect() as conn:
+        for label, action, expected in CHECKS:
+            plans = []
+            for statement, parameters in capture(lambda db: action(db, ids)):
+                plan = explain(conn, statement, parameters)
+                plans.extend(plan)
+                if args.verbose:
+                    print(f"  {' '.join(statement.split())[:160]}\n    " + "\n    ".join(plan))
+            missing = [index for index in expected if not any(index in line for line in plans)]
+            failures += bool(missing)
+            print(f"{label:<18} {'OK' if not missing else 'MISSING ' + ', '.join(missing)}")
+    if failures:
+        raise SystemExit(f"{failures} query group(s) did not use their index")
+    print("OK: hot queries use the hot-path indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measures login throughput (credential checks per second) at different hashing pool sizes.
+
+Runs ``auth_service.authenticate_user`` for many concurrent logins against a throwaway
+SQLite database, once per pool size. Pool size 0 hashes on the event loop's default
+thread pool, which is the closest to the old inline behaviour.
+
+    python -m benchmarks.login_throughput [--logins N] [--concurrency N] [--pool-sizes 0,1,2,4]
+"""
+
+import argparse
+import asyncio
+import os
+
+from benchmarks.common import create_schema, timer
+
+from app import models
+from app.config import get_settings
+from app.database.connection import SessionLocal
+from app.services import auth_service
+from app.utils import security
+
+PASSWORD = "benchmark-password"
+
+
+async def _login_storm(logins: int, concurrency: int, email: str) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one() -> None:
+        async with semaphore:
+            with SessionLocal() as db:
+                user = await auth_service.authenticate_user(db, email, PASSWORD)
+                if user is None:
+                    raise RuntimeError("benchmark login failed")
+
+    await asyncio.gather(*(_one() for _ in range(logins)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--pool-sizes", default=f"0,1,2,{os.cpu_count() or 4}")
+    args = parser.parse_args()
+
+    create_schema()
+    email = "bench@example.com"
+    with SessionLocal() as db:
+        db.add(models.User(email=email, password_hash=security.hash_password(PASSWORD)))
+        db.commit()
+
+    print(f"bcrypt rounds: {get_settings().bcrypt_rounds}, logins: {args.logins}, concurrency: {args.concurrency}")
+    print(f"{'pool size':>9} {'logins/sec':>11} {'ms/login':>9}")
+    for size in (int(value) for value in args.pool_sizes.split(",")):
+        security.configure_hash_pool(size)
+        # Warm-up so process start-up is not billed to the measurement.
+        asyncio.run(_login_storm(max(size, 1), max(size, 1), email))
+        with timer() as elapsed:
+            asyncio.run(_login_storm(args.logins, args.concurrency, email))
+        seconds = elapsed["seconds"]
+        print(f"{size:>9} {args.logins / seconds:>11.1f} {seconds * 1000 / args.logins:>9.1f}")
+    security.shutdown_hash_pool()
+
+
+if __name__ == "__main__":
+    main()
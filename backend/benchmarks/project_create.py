@@ -0,0 +1,80 @@
+"""
+Compares project creation with per-row flushes against the bulk insert path.
+
+For each project size, creates the same project both ways against a throwaway SQLite
+database and reports SQL statements and wall-clock time. SQLite runs in-process, so the
+statement count is the number to watch: against MySQL every statement is a network
+round trip.
+
+    python -m benchmarks.project_create [--repeat N]
+"""
+
+import argparse
+
+from benchmarks.common import count_queries, create_schema, timer
+
+from app import models, schemas
+from app.database.connection import SessionLocal
+from app.services import database_service
+
+SIZES = (5, 20, 100)
+
+
+def _payload(sections: int) -> list[schemas.DocumentStructureIn]:
+    return [
+        schemas.DocumentStructureIn(element_type="slide", title=f"Slide {idx}", order_index=idx)
+        for idx in range(sections)
+    ]
+
+
+def create_per_row(db, user_id: int, structures) -> None:
+    """The creation loop ``POST /projects/`` used before bulk inserts."""
+    project = models.Project(user_id=user_id, project_name="bench", document_type="pptx", main_topic="bench")
+    db.add(project)
+    db.flush()
+    for structure in structures:
+        doc_structure = models.DocumentStructure(
+            project_id=project.id,
+            element_type=structure.element_type,
+            title=structure.title,
+            order_index=structure.order_index,
+        )
+        db.add(doc_structure)
+        db.flush()
+        db.add(models.Content(structure_id=doc_structure.id))
+    db.commit()
+
+
+def create_bulk(db, user_id: int, structures) -> None:
+    project = models.Project(user_id=user_id, project_name="bench", document_type="pptx", main_topic="bench")
+    db.add(project)
+    db.flush()
+    database_service.insert_structures(db, project.id, structures)
+    db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="projects created per size and strategy")
+    args = parser.parse_args()
+
+    create_schema()
+    with SessionLocal() as db:
+        user = models.User(email="bench@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    print(f"{'sections':>8} {'strategy':>9} {'queries':>8} {'ms/project':>11}")
+    for size in SIZES:
+        structures = _payload(size)
+        for name, create in (("per-row", create_per_row), ("bulk", create_bulk)):
+            with SessionLocal() as db, count_queries() as counter, timer() as elapsed:
+                for _ in range(args.repeat):
+                    create(db, user_id, structures)
+            queries = counter["count"] // args.repeat
+            print(f"{size:>8} {name:>9} {queries:>8} {elapsed['seconds'] * 1000 / args.repeat:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Checks that reading a project tree costs a fixed number of SQL statements.
+
+Seeds projects of growing size into a throwaway SQLite database, serializes them the
+way ``GET /projects/{id}`` and ``GET /projects/`` do, and fails if the statement count
+changes with project size.
+
+    python -m benchmarks.query_counts
+"""
+
+import sys
+
+from benchmarks.common import count_queries, create_schema
+
+from app import schemas
+from app.database.connection import SessionLocal
+from app.models import Content, DocumentStructure, Project, User
+from app.services import database_service
+
+SIZES = (1, 5, 30, 100)
+HISTORY_PER_SECTION = 3
+
+
+def seed_project(db, user_id: int, sections: int) -> int:
+    project = Project(user_id=user_id, project_name=f"p{sections}", document_type="docx", main_topic="Benchmarks")
+    project.structures = [
+        DocumentStructure(
+            element_type="section",
+            title=f"Section {idx}",
+            order_index=idx,
+            content=Content(generated_content="text"),
+        )
+        for idx in range(sections)
+    ]
+    for structure in project.structures:
+        for _ in range(HISTORY_PER_SECTION):
+            structure.content.record_refinement("text", "text", "shorter")
+    db.add(project)
+    db.commit()
+    return project.id
+
+
+def main() -> int:
+    create_schema()
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        project_ids = {size: seed_project(db, user.id, size) for size in SIZES}
+        user_id = user.id
+
+    counts = {}
+    for size, project_id in project_ids.items():
+        with SessionLocal() as db, count_queries() as counter:
+            project = database_service.get_project_for_user(db, project_id, user_id)
+            schemas.ProjectOut.model_validate(project).model_dump()
+        counts[size] = counter["count"]
+        print(f"get_project  sections={size:<4} queries={counter['count']}")
+
+    with SessionLocal() as db, count_queries() as counter:
+        for project in database_service.list_projects_for_user(db, user_id):
+            schemas.ProjectOut.model_validate(project).model_dump()
+    print(f"list_projects projects={len(SIZES):<3} queries={counter['count']}")
+
+    if len(set(counts.values())) != 1:
+        print("FAIL: query count grows with project size")
+        return 1
+    print("OK: query count is independent of project size")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
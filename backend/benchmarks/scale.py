@@ -0,0 +1,175 @@
+"""
+Checks that per-tenant latencies stay flat as the database grows.
+
+Seeds one measured tenant with a fixed, heavy shape (hundreds of projects, sections with
+long refinement histories) using the synthetic data generator, then grows the database
+in tiers of background tenants. At each tier it measures the dashboard listing, a page of
+project summaries, fetching the tenant's largest project and exporting it, all through
+the full ASGI app. Exports are measured rendered (the project's content version is bumped
+before each sample, as an edit would) and served from the export cache. Fails when a p50 exceeds its budget or grows by more than
+``--max-growth`` times the first tier: none of these should depend on other tenants' data.
+
+    python -m benchmarks.scale [--tiers 0,100,400] [--samples N] [--max-growth 2.0]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import datetime
+
+os.environ.setdefault("TRACING_EXPORTER", "none")
+
+from benchmarks.common import timer  # noqa: E402
+
+import httpx  # noqa: E402
+from sqlalchemy import func, select, update  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database.connection import SessionLocal  # noqa: E402
+from app.database.migrations import run_migrations  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.auth_service import create_access_token  # noqa: E402
+from seed_synthetic_data import Distribution, Shape, SyntheticWriter  # noqa: E402
+
+# The measured tenant: the heavy users the request describes.
+TENANT_SHAPE = Shape(
+    projects=Distribution.parse("200"),
+    sections=Distribution.parse("10-30"),
+    refinements=Distribution.parse("lognormal:8:60"),
+)
+BACKGROUND_SHAPE = Shape(
+    projects=Distribution.parse("lognormal:20:500"),
+    sections=Distribution.parse("5-30"),
+    refinements=Distribution.parse("lognormal:3:60"),
+)
+# p50 budgets in milliseconds for SQLite on a developer machine.
+BUDGETS_MS = {
+    "dashboard_list": 2000,
+    "summary_page": 100,
+    "project_get": 250,
+    "export": 1000,
+    "export_cached": 100,
+}
+
+
+def largest_project(user_id: int) -> int:
+    with SessionLocal() as db:
+        return db.execute(
+            select(models.DocumentStructure.project_id)
+            .join(models.Project)
+            .where(models.Project.user_id == user_id)
+            .group_by(models.DocumentStructure.project_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        ).scalar_one()
+
+
+def table_rows() -> int:
+    with SessionLocal() as db:
+        return sum(
+            db.scalar(select(func.count()).select_from(model))
+            for model in (models.Project, models.DocumentStructure, models.Content, models.RefinementHistory)
+        )
+
+
+def bump_version(project_id: int) -> None:
+    """Invalidate the project's cached exports, as an edit would, so the next export renders."""
+    with SessionLocal() as db:
+        db.execute(
+            update(models.Project)
+            .where(models.Project.id == project_id)
+            .values(content_version=models.Project.content_version + 1)
+        )
+        db.commit()
+
+
+async def measure(client: httpx.AsyncClient, path: str, samples: int, before=None) -> float:
+    latencies = []
+    for _ in range(samples):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        response = await client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise SystemExit(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+    return statistics.median(latencies)
+
+
+async def measure_tier(email: str, project_id: int, samples: int) -> dict:
+    token, _ = create_access_token(email)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", headers={"Authorization": f"Bearer {token}"}, timeout=None
+    ) as client:
+        return {
+            "dashboard_list": await measure(client, "/projects/", max(1, samples // 5)),
+            "summary_page": await measure(client, "/projects/summary?limit=20", samples),
+            "project_get": await measure(client, f"/projects/{project_id}", samples),
+            "export": await measure(
+                client, f"/export/{project_id}", max(1, samples // 2), before=lambda: bump_version(project_id)
+            ),
+            "export_cached": await measure(client, f"/export/{project_id}", samples),
+        }
+
+
+async def run(args) -> list[str]:
+    writer = SyntheticWriter(random.Random(args.seed), batch_size=5000)
+    now = datetime.utcnow()
+    user_id, email = writer.add_user(TENANT_SHAPE, now)
+    writer.flush()
+    project_id = largest_project(user_id)
+
+    baseline: dict = {}
+    problems = []
+    seeded = 0
+    print(f"{'tenants':>8} {'rows':>10} " + " ".join(f"{name + ' ms':>17}" for name in BUDGETS_MS))
+    async with app.router.lifespan_context(app):
+        for tier in args.tiers:
+            with timer() as elapsed:
+                for _ in range(tier - seeded):
+                    writer.add_user(BACKGROUND_SHAPE, now)
+                writer.flush()
+            seeded = max(seeded, tier)
+            results = await measure_tier(email, project_id, args.samples)
+            baseline = baseline or results
+            print(
+                f"{tier:>8} {table_rows():>10,} "
+                + " ".join(f"{results[name]:>17.1f}" for name in BUDGETS_MS)
+                + f"   (seeded in {elapsed['seconds']:.0f}s)"
+            )
+            for name, value in results.items():
+                if value > BUDGETS_MS[name]:
+                    problems.append(f"{name} at {tier} tenants: {value:.0f} ms over the {BUDGETS_MS[name]} ms budget")
+                if value > baseline[name] * args.max_growth:
+                    problems.append(
+                        f"{name} at {tier} tenants: {value:.0f} ms, {value / baseline[name]:.1f}x the first tier"
+                    )
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--tiers",
+        type=lambda value: [int(tier) for tier in value.split(",")],
+        default=[0, 100, 400],
+        help="cumulative background tenants at each measurement",
+    )
+    parser.add_argument("--samples", type=int, default=10, help="requests per endpoint and tier")
+    parser.add_argument("--max-growth", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    run_migrations()
+    problems = asyncio.run(run(args))
+    if problems:
+        raise SystemExit("FAIL: " + "; ".join(problems))
+    print("OK: per-tenant latencies stay within budget as the database grows")
+
+
+if __name__ == "__main__":
+    main()
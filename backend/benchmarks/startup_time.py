@@ -0,0 +1,96 @@
+"""
+Measures cold-start cost: importing ``app.main`` and running its startup hooks.
+
+Each sample is a fresh interpreter, as a new worker would be. The script fails when the
+median import time exceeds the budget or when a library that should load lazily
+(Gemini SDK, python-docx, python-pptx) is imported eagerly.
+
+    python -m benchmarks.startup_time [--runs N] [--budget-ms MS] [--warm-up] [--top N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Budget for the median ``import app.main``; lower it as start-up gets faster.
+IMPORT_BUDGET_MS = 2000
+LAZY_MODULES = ("google.generativeai", "docx", "pptx", "alembic")
+
+_PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+eager = [name for name in {lazy!r} if name in sys.modules]
+
+async def _startup():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(_startup())
+print(json.dumps({{"import_ms": (imported - started) * 1000, "startup_ms": (ready - imported) * 1000, "eager": eager}}))
+"""
+
+
+def sample(env: dict) -> dict:
+    probe = _PROBE.format(lazy=LAZY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", probe], env=env, capture_output=True, text=True, check=True, cwd=os.getcwd()
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, top: int) -> list[tuple[int, str]]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], env=env, capture_output=True, text=True
+    ).stderr
+    rows = []
+    # Lines look like "import time:   243 |   163956 |   app.middleware.auth_middleware".
+    for line in stderr.splitlines():
+        fields = [field.strip() for field in line.removeprefix("import time:").split("|")]
+        if len(fields) == 3 and fields[0].isdigit():
+            rows.append((int(fields[0]), fields[2]))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--warm-up", action="store_true", help="measure with WARM_UP_ON_STARTUP enabled")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest modules by self time")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="startup-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": os.environ.get("DATABASE_URL", f"sqlite:///{os.path.join(db_dir, 'startup.db')}"),
+        "WARM_UP_ON_STARTUP": "true" if args.warm_up else "false",
+        "DB_MIGRATE_ON_STARTUP": "false",
+    }
+    samples = [sample(env) for _ in range(args.runs)]
+    import_ms = statistics.median(s["import_ms"] for s in samples)
+    startup_ms = statistics.median(s["startup_ms"] for s in samples)
+    eager = sorted({name for s in samples for name in s["eager"]})
+
+    print(f"import app.main   median {import_ms:8.1f} ms  (budget {args.budget_ms:.0f} ms, {args.runs} runs)")
+    print(f"lifespan startup  median {startup_ms:8.1f} ms  (warm-up {'on' if args.warm_up else 'off'})")
+    for self_us, name in slowest_imports(env, args.top) if args.top else ():
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    problems = []
+    if import_ms > args.budget_ms:
+        problems.append(f"import took {import_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    if eager:
+        problems.append(f"imported eagerly: {', '.join(eager)}")
+    if problems:
+        raise SystemExit("FAIL: " + "; ".join(problems))
+    print("OK: within budget and heavy libraries load lazily")
+
+
+if __name__ == "__main__":
+    main()
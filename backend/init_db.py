@@ -1,14 +1,14 @@
 """
 Database initialization script.
-Creates the database and tables if they don't exist.
-Run this once before starting the application.
+Creates the database if it doesn't exist and migrates it to the latest schema.
+Run this once before starting the application (and after every upgrade).
 """
 
 import pymysql
 from pymysql import Error as MySQLError
 
 from app.config import get_settings
-from app.database.connection import Base, engine
+from app.database.migrations import run_migrations
 
 settings = get_settings()
 
@@ -42,9 +42,9 @@ def create_database():
         connection.close()
         connection = None
 
-        # Now create tables
-        Base.metadata.create_all(bind=engine)
-        print("✓ All tables created successfully")
+        # Now create or upgrade tables
+        run_migrations()
+        print("✓ Schema migrated to the latest revision")
 
     except MySQLError as e:
         print(f"✗ Error creating database: {e}")
@@ -0,0 +1,107 @@
+"""
+One-off migration: convert refinement history from full old/new text to deltas.
+
+Adds the ``base_content`` and ``delta`` columns, encodes every existing row with the same
+rules the application uses for new rows, then drops ``old_content`` and ``new_content``.
+Safe to re-run: it does nothing once the old columns are gone.
+
+Reads and writes ``--batch-size`` sections' history at a time, so memory use does not
+grow with the table.
+
+    python migrate_history_deltas.py [--dry-run] [--batch-size 1000]
+"""
+
+import argparse
+from itertools import groupby
+
+from sqlalchemy import inspect, text
+
+from app.config import get_settings
+from app.database.connection import engine
+from app.utils.delta import apply_delta, encode_revision
+
+settings = get_settings()
+
+
+def _add_columns(conn, columns: set[str]) -> None:
+    if "base_content" not in columns:
+        conn.execute(text("ALTER TABLE refinement_history ADD COLUMN base_content TEXT NULL"))
+    if "delta" not in columns:
+        conn.execute(text("ALTER TABLE refinement_history ADD COLUMN delta TEXT NULL"))
+
+
+def _encode_rows(rows) -> list[dict]:
+    updates = []
+    for _, chain in groupby(rows, key=lambda row: row.content_id):
+        previous = None
+        since_snapshot = 0
+        for row in chain:
+            base_content, delta = encode_revision(
+                previous, row.old_content, row.new_content, since_snapshot, settings.history_snapshot_interval
+            )
+            since_snapshot = 0 if base_content is not None else since_snapshot + 1
+            if apply_delta(row.old_content or "", delta) != row.new_content:
+                raise RuntimeError(f"delta round-trip failed for refinement_history {row.id}")
+            updates.append({"row_id": row.id, "base_content": base_content, "delta": delta})
+            previous = row.new_content
+    return updates
+
+
+def _chains(conn, batch_size: int):
+    """Yield the old rows ``batch_size`` sections at a time, each section's chain whole and in order."""
+    after = 0
+    while True:
+        content_ids = conn.execute(
+            text(
+                "SELECT DISTINCT content_id FROM refinement_history WHERE content_id > :after "
+                "ORDER BY content_id LIMIT :limit"
+            ),
+            {"after": after, "limit": batch_size},
+        ).scalars().all()
+        if not content_ids:
+            return
+        yield conn.execute(
+            text(
+                "SELECT id, content_id, old_content, new_content FROM refinement_history "
+                "WHERE content_id > :after AND content_id <= :last ORDER BY content_id, created_at, id"
+            ),
+            {"after": after, "last": content_ids[-1]},
+        ).all()
+        after = content_ids[-1]
+
+
+def migrate(dry_run: bool, batch_size: int) -> None:
+    columns = {column["name"] for column in inspect(engine).get_columns("refinement_history")}
+    if "old_content" not in columns:
+        print("✓ refinement_history is already delta-encoded")
+        return
+
+    with engine.begin() as conn:
+        if not dry_run:
+            _add_columns(conn, columns)
+        statement = text("UPDATE refinement_history SET base_content = :base_content, delta = :delta WHERE id = :row_id")
+        count = before = after = 0
+        for rows in _chains(conn, batch_size):
+            updates = _encode_rows(rows)
+            count += len(rows)
+            before += sum(len(row.old_content or "") + len(row.new_content) for row in rows)
+            after += sum(len(update["base_content"] or "") + len(update["delta"]) for update in updates)
+            if not dry_run:
+                conn.execute(statement, updates)
+        print(f"{count} rows: {before:,} chars -> {after:,} chars ({after / max(before, 1):.1%})")
+        if dry_run:
+            return
+
+        conn.execute(text("ALTER TABLE refinement_history DROP COLUMN old_content"))
+        conn.execute(text("ALTER TABLE refinement_history DROP COLUMN new_content"))
+        if engine.dialect.name == "mysql":
+            conn.execute(text("ALTER TABLE refinement_history MODIFY delta TEXT NOT NULL"))
+    print("✓ refinement_history migrated to deltas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dry-run", action="store_true", help="report the size change without writing")
+    parser.add_argument("--batch-size", type=int, default=1000, help="sections whose history is read and written at a time")
+    args = parser.parse_args()
+    migrate(args.dry_run, args.batch_size)
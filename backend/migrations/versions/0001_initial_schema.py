@@ -0,0 +1,137 @@
+"""initial schema
+
+The full schema as of the first revision. Databases created by the old
+``Base.metadata.create_all`` are stamped here by ``app.database.migrations.run_migrations``
+instead of re-running it, once ``migrate_history_deltas.py`` has converted their history.
+They still lack ``prompt_cache``, which 0004 creates.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:21:34.161374
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('prompt_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('model_name', sa.String(length=100), nullable=False),
+    sa.Column('response_text', sa.Text(), nullable=False),
+    sa.Column('hit_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('prompt_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_prompt_cache_cache_key'), ['cache_key'], unique=True)
+        batch_op.create_index(batch_op.f('ix_prompt_cache_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_prompt_cache_id'), ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+
+    op.create_table('projects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('project_name', sa.String(length=255), nullable=False),
+    sa.Column('document_type', sa.Enum('docx', 'pptx', name='document_type_enum'), nullable=False),
+    sa.Column('main_topic', sa.String(length=500), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_projects_id'), ['id'], unique=False)
+
+    op.create_table('document_structure',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('element_type', sa.Enum('section', 'slide', name='element_enum'), nullable=False),
+    sa.Column('title', sa.String(length=500), nullable=False),
+    sa.Column('order_index', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('document_structure', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_document_structure_id'), ['id'], unique=False)
+
+    op.create_table('content_blocks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('structure_id', sa.Integer(), nullable=False),
+    sa.Column('generated_content', sa.Text(), nullable=False),
+    sa.Column('refinement_prompt', sa.Text(), nullable=True),
+    sa.Column('likes_count', sa.Integer(), nullable=True),
+    sa.Column('dislikes_count', sa.Integer(), nullable=True),
+    sa.Column('comments', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['structure_id'], ['document_structure.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('content_blocks', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_content_blocks_id'), ['id'], unique=False)
+
+    op.create_table('refinement_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_id', sa.Integer(), nullable=False),
+    sa.Column('base_content', sa.Text(), nullable=True),
+    sa.Column('delta', sa.Text(), nullable=False),
+    sa.Column('refinement_prompt', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['content_id'], ['content_blocks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('refinement_history', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_refinement_history_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('refinement_history', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_refinement_history_id'))
+
+    op.drop_table('refinement_history')
+    with op.batch_alter_table('content_blocks', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_content_blocks_id'))
+
+    op.drop_table('content_blocks')
+    with op.batch_alter_table('document_structure', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_document_structure_id'))
+
+    op.drop_table('document_structure')
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_projects_id'))
+
+    op.drop_table('projects')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    with op.batch_alter_table('prompt_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_prompt_cache_id'))
+        batch_op.drop_index(batch_op.f('ix_prompt_cache_created_at'))
+        batch_op.drop_index(batch_op.f('ix_prompt_cache_cache_key'))
+
+    op.drop_table('prompt_cache')
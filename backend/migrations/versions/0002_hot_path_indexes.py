@@ -0,0 +1,55 @@
+"""hot path indexes
+
+Composite indexes for project listing, structure ordering and history pagination, and a
+unique index enforcing one content block per structure.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:21:36.121773
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(
+        sa.text("SELECT structure_id FROM content_blocks GROUP BY structure_id HAVING COUNT(*) > 1 LIMIT 5")
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            f"content_blocks has several rows for structures {duplicates}; merge them before upgrading"
+        )
+
+    with op.batch_alter_table('content_blocks', schema=None) as batch_op:
+        batch_op.create_index('uq_content_blocks_structure_id', ['structure_id'], unique=True)
+
+    with op.batch_alter_table('document_structure', schema=None) as batch_op:
+        batch_op.create_index('ix_document_structure_project_id_order_index', ['project_id', 'order_index'], unique=False)
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index('ix_projects_user_id_updated_at', ['user_id', 'updated_at'], unique=False)
+
+    with op.batch_alter_table('refinement_history', schema=None) as batch_op:
+        batch_op.create_index('ix_refinement_history_content_id_created_at', ['content_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('refinement_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_refinement_history_content_id_created_at')
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index('ix_projects_user_id_updated_at')
+
+    with op.batch_alter_table('document_structure', schema=None) as batch_op:
+        batch_op.drop_index('ix_document_structure_project_id_order_index')
+
+    with op.batch_alter_table('content_blocks', schema=None) as batch_op:
+        batch_op.drop_index('uq_content_blocks_structure_id')
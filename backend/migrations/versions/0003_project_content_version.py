@@ -0,0 +1,29 @@
+"""project content version
+
+A per-project counter bumped whenever rendered content changes, used to key cached
+exports and as their ETag.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:54:26.804942
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('content_version')
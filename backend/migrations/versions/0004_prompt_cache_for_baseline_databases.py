@@ -0,0 +1,45 @@
+"""prompt cache for baseline databases
+
+``prompt_cache`` was added to the models after the last ``create_all`` deployment, so
+databases stamped at 0001 from that schema do not have it. Creates it when missing;
+databases built by 0001 already have it and are left alone.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:02:11.518304
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'prompt_cache' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table('prompt_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('model_name', sa.String(length=100), nullable=False),
+    sa.Column('response_text', sa.Text(), nullable=False),
+    sa.Column('hit_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('prompt_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_prompt_cache_cache_key'), ['cache_key'], unique=True)
+        batch_op.create_index(batch_op.f('ix_prompt_cache_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_prompt_cache_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    # The table belongs to 0001 for databases built by Alembic; dropping it here would break them.
+    pass
@@ -1,21 +1,27 @@
-import uvicorn
+import argparse
 import sys
 
+import uvicorn
+
 from app.config import get_settings
 
 settings = get_settings()
 
 
 def main():
-    try:
-        # Try to initialize database on startup
-        from init_db import create_database
-        print("Checking database...")
-        create_database()
-    except Exception as e:
-        print(f"Warning: Could not initialize database: {e}")
-        print("Please run 'python init_db.py' manually to set up the database.")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Run the API server.")
+    parser.add_argument("--init-db", action="store_true", help="create and migrate the database before starting")
+    args = parser.parse_args()
+
+    if args.init_db:
+        try:
+            from init_db import create_database
+            print("Checking database...")
+            create_database()
+        except Exception as e:
+            print(f"Warning: Could not initialize database: {e}")
+            print("Please run 'python init_db.py' manually to set up the database.")
+            sys.exit(1)
 
     uvicorn.run(
         "app.main:app",
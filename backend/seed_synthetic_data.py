@@ -0,0 +1,273 @@
+"""
+Bulk-populates the database with synthetic tenants for load and scale testing.
+
+Generates users, projects, structures, content and refinement history with configurable
+distributions, and writes them with multi-row Core inserts in batches. Primary keys are
+assigned here rather than by the database, so child rows need no round trip to learn
+their parent's id. Run it against a database nobody else is writing to.
+
+Refinement history uses the application's delta format and snapshot interval. Revisions
+are random word substitutions, so their deltas are built directly instead of diffed.
+Every user's password is ``--password``, so any synthetic account can log in.
+
+Distributions are ``N`` (fixed), ``A-B`` (uniform) or ``lognormal:MEAN[:MAX]``, which has
+the long tail of real tenants: most users own a few projects, a few own hundreds.
+
+    python seed_synthetic_data.py [--users N] [--projects-per-user SPEC] [--sections-per-project SPEC]
+                                  [--refinements-per-section SPEC] [--words N] [--batch-size N] [--seed N]
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, insert, select
+
+from app import models
+from app.config import get_settings
+from app.database.connection import engine
+from app.utils.delta import apply_delta
+from app.utils.security import hash_password
+
+settings = get_settings()
+
+# Parents before children, so every batch satisfies the foreign keys.
+TABLES = (
+    models.User.__table__,
+    models.Project.__table__,
+    models.DocumentStructure.__table__,
+    models.Content.__table__,
+    models.RefinementHistory.__table__,
+)
+
+_WORDS = (
+    "revenue growth customer market strategy pipeline forecast margin quarter churn retention "
+    "onboarding platform roadmap milestone budget hiring risk compliance partner launch pricing "
+    "segment adoption feedback latency uptime security migration analytics dashboard renewal "
+    "expansion efficiency automation integration support escalation backlog delivery"
+).split()
+_TOPICS = (
+    "Quarterly business review",
+    "Product launch plan",
+    "Security incident retrospective",
+    "Market entry strategy",
+    "Annual budget proposal",
+    "Customer onboarding playbook",
+)
+_TOKEN = re.compile(r"\s+|\S+")
+_PROMPTS = ("Make it shorter", "More formal tone", "Add concrete numbers", "Simplify the wording", "Expand on risks")
+
+
+@dataclass
+class Distribution:
+    kind: str
+    low: float
+    high: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "Distribution":
+        if spec.startswith("lognormal:"):
+            mean, _, maximum = spec.removeprefix("lognormal:").partition(":")
+            return cls("lognormal", float(mean), float(maximum) if maximum else math.inf)
+        if "-" in spec:
+            low, high = spec.split("-", 1)
+            return cls("uniform", int(low), int(high))
+        return cls("fixed", int(spec), int(spec))
+
+    def sample(self, rng: random.Random) -> int:
+        if self.kind == "fixed":
+            return int(self.low)
+        if self.kind == "uniform":
+            return rng.randint(int(self.low), int(self.high))
+        # sigma=1 with mu chosen so the distribution's mean is ``low``.
+        value = rng.lognormvariate(math.log(max(self.low, 1e-9)) - 0.5, 1.0)
+        return int(min(round(value), self.high))
+
+
+@dataclass
+class Shape:
+    projects: Distribution
+    sections: Distribution
+    refinements: Distribution
+    words: int = 120
+
+
+class SyntheticWriter:
+    """Generates tenants and inserts them in batches of roughly ``batch_size`` rows."""
+
+    def __init__(self, rng: random.Random, batch_size: int = 5000, password_hash: Optional[str] = None):
+        self.rng = rng
+        self.batch_size = batch_size
+        self.password_hash = password_hash or hash_password("synthetic-password")
+        self.counts = {table.name: 0 for table in TABLES}
+        self._pending = {table.name: [] for table in TABLES}
+        self._next_id = self._max_ids()
+
+    @staticmethod
+    def _max_ids() -> dict:
+        with engine.connect() as conn:
+            return {table.name: (conn.scalar(select(func.max(table.c.id))) or 0) + 1 for table in TABLES}
+
+    def _id(self, table: str) -> int:
+        value = self._next_id[table]
+        self._next_id[table] += 1
+        return value
+
+    def _add(self, table: str, row: dict) -> None:
+        self._pending[table].append(row)
+        self.counts[table] += 1
+
+    def _text(self, words: int) -> str:
+        tokens = self.rng.choices(_WORDS, k=max(words, 1))
+        lines = [" ".join(tokens[start:start + 12]).capitalize() + "." for start in range(0, len(tokens), 12)]
+        return "\n".join(lines)
+
+    def _revise(self, tokens: list[str]) -> str:
+        """Swap a few words of ``tokens`` in place and return the delta for the change."""
+        changed = sorted(set(self.rng.randrange(0, len(tokens), 2) for _ in range(max(1, len(tokens) // 40))))
+        ops: list = []
+        copied_to = 0
+        for index in changed:
+            if index > copied_to:
+                ops.append(index - copied_to)
+            tokens[index] = self.rng.choice(_WORDS)
+            ops.extend((-1, tokens[index]))
+            copied_to = index + 1
+        if copied_to < len(tokens):
+            ops.append(len(tokens) - copied_to)
+        return json.dumps(ops, separators=(",", ":"))
+
+    def add_user(self, shape: Shape, now: datetime, email: Optional[str] = None) -> tuple[int, str]:
+        user_id = self._id("users")
+        email = email or f"user{user_id}@synthetic.example.com"
+        joined = now - timedelta(days=self.rng.uniform(30, 730))
+        self._add(
+            "users",
+            {"id": user_id, "email": email, "password_hash": self.password_hash, "created_at": joined, "updated_at": joined},
+        )
+        for _ in range(shape.projects.sample(self.rng)):
+            self._add_project(user_id, shape, joined, now)
+        return user_id, email
+
+    def _add_project(self, user_id: int, shape: Shape, joined: datetime, now: datetime) -> None:
+        project_id = self._id("projects")
+        document_type = self.rng.choice(("docx", "pptx"))
+        created = joined + (now - joined) * self.rng.random()
+        updated = created
+        for order_index in range(shape.sections.sample(self.rng)):
+            structure_id = self._id("document_structure")
+            content_id = self._id("content_blocks")
+            self._add(
+                "document_structure",
+                {
+                    "id": structure_id,
+                    "project_id": project_id,
+                    "element_type": "section" if document_type == "docx" else "slide",
+                    "title": f"{self.rng.choice(_WORDS).capitalize()} {order_index + 1}",
+                    "order_index": order_index,
+                    "created_at": created,
+                },
+            )
+            text = self._text(shape.words)
+            # Same tokenisation as app.utils.delta: words at even positions, whitespace at odd ones.
+            tokens = _TOKEN.findall(text)
+            stamp = created
+            for revision in range(shape.refinements.sample(self.rng)):
+                delta = self._revise(tokens)
+                revised = "".join(tokens)
+                if revision == 0 and apply_delta(text, delta) != revised:
+                    raise RuntimeError("synthetic delta does not reproduce its revision")
+                # Matches encode_revision: a snapshot, then up to ``interval`` deltas, then a snapshot.
+                snapshot = revision % (settings.history_snapshot_interval + 1) == 0
+                stamp += timedelta(minutes=self.rng.uniform(1, 600))
+                self._add(
+                    "refinement_history",
+                    {
+                        "id": self._id("refinement_history"),
+                        "content_id": content_id,
+                        "base_content": text if snapshot else None,
+                        "delta": delta,
+                        "refinement_prompt": self.rng.choice(_PROMPTS),
+                        "created_at": stamp,
+                        "updated_at": stamp,
+                    },
+                )
+                text = revised
+            self._add(
+                "content_blocks",
+                {
+                    "id": content_id,
+                    "structure_id": structure_id,
+                    "generated_content": text,
+                    "refinement_prompt": "",
+                    "likes_count": self.rng.randint(0, 5),
+                    "dislikes_count": self.rng.randint(0, 2),
+                    "comments": "",
+                    "created_at": created,
+                    "updated_at": stamp,
+                },
+            )
+            updated = max(updated, stamp)
+        self._add(
+            "projects",
+            {
+                "id": project_id,
+                "user_id": user_id,
+                "project_name": f"{self.rng.choice(_TOPICS)} #{project_id}",
+                "document_type": document_type,
+                "main_topic": self.rng.choice(_TOPICS),
+                "created_at": created,
+                "updated_at": updated,
+            },
+        )
+        if sum(len(rows) for rows in self._pending.values()) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        pending, self._pending = self._pending, {table.name: [] for table in TABLES}
+        with engine.begin() as conn:
+            for table in TABLES:
+                if pending[table.name]:
+                    conn.execute(insert(table), pending[table.name])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--projects-per-user", default="lognormal:20:500")
+    parser.add_argument("--sections-per-project", default="5-30")
+    parser.add_argument("--refinements-per-section", default="lognormal:3:60")
+    parser.add_argument("--words", type=int, default=120, help="words of generated content per section")
+    parser.add_argument("--password", default="synthetic-password")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per insert transaction")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    shape = Shape(
+        projects=Distribution.parse(args.projects_per_user),
+        sections=Distribution.parse(args.sections_per_project),
+        refinements=Distribution.parse(args.refinements_per_section),
+        words=args.words,
+    )
+    writer = SyntheticWriter(random.Random(args.seed), args.batch_size, hash_password(args.password))
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    for _ in range(args.users):
+        writer.add_user(shape, now)
+    writer.flush()
+    seconds = time.perf_counter() - started
+
+    total = sum(writer.counts.values())
+    for table, count in writer.counts.items():
+        print(f"  {table:<20} {count:>10,}")
+    print(f"✓ Inserted {total:,} rows in {seconds:.1f}s ({total / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
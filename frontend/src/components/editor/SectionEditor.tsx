@@ -60,8 +60,13 @@ function BaseEditor({ projectId, structure, label }: BaseEditorProps) {
   const handleFeedback = async (positive: boolean) => {
     setStatus("");
     try {
-      const response = await sendFeedback(token, structure.id, positive);
-      safeUpdate(response);
+      const counts = await sendFeedback(token, structure.id, positive);
+      if (structure.content) {
+        updateStructure(projectId, {
+          ...structure,
+          content: { ...structure.content, likes_count: counts.likes_count, dislikes_count: counts.dislikes_count },
+        });
+      }
     } catch (error) {
       setStatus((error as Error).message);
     }
@@ -21,7 +21,7 @@ export async function apiRequest<T>(
   return response.json();
 }
 
-export async function downloadBinary(path: string, token?: string) {
+export async function fetchBinary(path: string, token?: string) {
   const headers = new Headers();
   if (token) {
     headers.set("Authorization", `Bearer ${token}`);
@@ -31,6 +31,10 @@ export async function downloadBinary(path: string, token?: string) {
     const message = await response.json().catch(() => ({ detail: response.statusText }));
     throw new Error(message.detail ?? "Download failed");
   }
-  return response.blob();
+  return response;
 }
 
+export async function downloadBinary(path: string, token?: string) {
+  const response = await fetchBinary(path, token);
+  return response.blob();
+}
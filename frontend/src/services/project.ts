@@ -1,5 +1,9 @@
-import type { DocumentStructure, Project, ProjectInput } from "../types";
-import { apiRequest, downloadBinary } from "./api";
+import type { DocumentStructure, ExportJob, FeedbackCounts, Project, ProjectInput } from "../types";
+import { apiRequest, downloadBinary, fetchBinary } from "./api";
+
+const EXPORT_POLL_INTERVAL_MS = 1000;
+// Past the server's job timeout (EXPORT_JOB_TIMEOUT_SECONDS), so a stuck job is reported by the server first.
+const EXPORT_POLL_MAX_ATTEMPTS = 660;
 
 export function fetchProjects(token: string) {
   return apiRequest<Project[]>("/projects/", {}, token);
@@ -51,7 +55,7 @@ export function refineSection(
 }
 
 export function sendFeedback(token: string, structureId: number, positive: boolean) {
-  return apiRequest<DocumentStructure>(
+  return apiRequest<FeedbackCounts>(
     `/generate/${structureId}/feedback`,
     {
       method: "POST",
@@ -89,7 +93,23 @@ export function requestOutline(
 }
 
 export async function exportDocument(token: string, projectId: number) {
-  return downloadBinary(`/export/${projectId}`, token);
+  const response = await fetchBinary(`/export/${projectId}`, token);
+  if (response.status !== 202) {
+    return response.blob();
+  }
+  // Large projects are rendered in the background; poll the job until the file is ready.
+  let job: ExportJob = await response.json();
+  for (let attempt = 0; job.status === "pending"; attempt += 1) {
+    if (attempt >= EXPORT_POLL_MAX_ATTEMPTS) {
+      throw new Error("Export is taking too long; try again later");
+    }
+    await new Promise((resolve) => setTimeout(resolve, EXPORT_POLL_INTERVAL_MS));
+    job = await apiRequest<ExportJob>(job.status_url, {}, token);
+  }
+  if (job.status === "failed" || !job.download_url) {
+    throw new Error(job.error ?? "Export failed");
+  }
+  return downloadBinary(job.download_url, token);
 }
 
 
@@ -30,11 +30,26 @@ export interface Content {
   likes_count: number;
   dislikes_count: number;
   comments: string;
-  history: RefinementHistory[];
+  history?: RefinementHistory[] | null;
   created_at: string;
   updated_at: string;
 }
 
+export interface FeedbackCounts {
+  structure_id: number;
+  likes_count: number;
+  dislikes_count: number;
+}
+
+export interface ExportJob {
+  id: string;
+  project_id: number;
+  status: "pending" | "done" | "failed";
+  error: string | null;
+  status_url: string;
+  download_url: string | null;
+}
+
 export interface Project {
   id: number;
   project_name: string;